@@ -0,0 +1,92 @@
+"""
+Benchmark del lector CSV: ruta pandas actual vs. lector tipado (pyarrow).
+Genera un CSV sintético con la distribución del dataset crudo y mide
+load_data + basic_clean en ambos modos, tras comprobar que ambos coinciden
+con una entrada sucia.
+
+Uso: python benchmarks/bench_csv_loader.py --rows 10000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src import data_processing as dp
+
+RAW_PATH = ROOT / 'data' / 'raw' / 'movie_theatre_sales.csv'
+
+
+def make_synthetic_csv(path, rows, seed=42, block=1_000_000):
+    """Escribe `rows` filas remuestreando el CSV crudo (por bloques)."""
+    base = pd.read_csv(RAW_PATH)
+    rng = np.random.default_rng(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < rows:
+            n = min(block, rows - written)
+            sample = base.iloc[rng.integers(0, len(base), n)].copy()
+            sample['Ticket_ID'] = [f'T{i}' for i in range(written, written + n)]
+            sample.to_csv(f, index=False, header=written == 0)
+            written += n
+
+
+def check_dirty_input(path):
+    """El lector tipado debe coincidir con la ruta pandas ante celdas sucias y cabeceras con espacios."""
+    base = pd.read_csv(RAW_PATH)
+    # Solo grupos numéricos: "Alone" se traduce en la ruta tipada y se descarta en pandas
+    base = base[pd.to_numeric(base['Number_of_Person'], errors='coerce').notna()]
+    dirty = base.head(200).astype(object).reset_index(drop=True)
+    dirty.loc[0, 'Age'] = 'abc'
+    dirty.loc[1, 'Ticket_Price'] = ' 12.5 '
+    dirty.loc[2, 'Ticket_Price'] = 'n/a'
+    dirty.loc[3, 'Age'] = ''
+    dirty.columns = [f' {c}' if c in ('Age', 'Movie_Genre') else c for c in dirty.columns]
+    dirty.to_csv(path, index=False)
+
+    df_pd = dp.basic_clean(dp.load_data(path))
+    df_pa = dp.basic_clean(dp.load_data(path, typed=True))
+    for c in dp.essential_columns:
+        pd.testing.assert_series_equal(df_pd[c], df_pa[c], check_dtype=False, check_categorical=False)
+    print(f'Entrada sucia: {len(dirty)} filas, {len(df_pa)} limpias en ambas rutas')
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_dirty_input(os.path.join(tmp, 'dirty.csv'))
+        path = os.path.join(tmp, 'sales.csv')
+        make_synthetic_csv(path, args.rows)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f'CSV sintético: {args.rows:,} filas, {size_mb:,.0f} MB')
+
+        df_pd, t_pd = timed(lambda: dp.basic_clean(dp.load_data(path)))
+        mem_pd = df_pd.memory_usage(deep=True).sum() / 1e6
+        del df_pd
+        df_pa, t_pa = timed(lambda: dp.basic_clean(dp.load_data(path, typed=True)))
+        mem_pa = df_pa.memory_usage(deep=True).sum() / 1e6
+
+    print(f'{"ruta":<12}{"segundos":>10}{"filas/s":>14}{"MB en RAM":>12}')
+    print(f'{"pandas":<12}{t_pd:>10.2f}{args.rows / t_pd:>14,.0f}{mem_pd:>12,.0f}')
+    print(f'{"pyarrow":<12}{t_pa:>10.2f}{args.rows / t_pa:>14,.0f}{mem_pa:>12,.0f}')
+    print(f'Aceleración: {t_pd / t_pa:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Evaluación robusta: CV en paralelo e intervalos bootstrap vectorizados.
+
+1) `evaluation.cross_validate_models` (retención y propensión, 5 folds) con
+   un proceso y con todos los núcleos, sobre el dataset sintético de
+   `bench_retention_models`.
+2) `evaluation.bootstrap_report` sobre tests sintéticos de distintos tamaños,
+   comparado en el más chico con el bootstrap ingenuo (un `roc_auc_score` y
+   un `f1_score` de sklearn por réplica).
+
+Uso: python benchmarks/bench_evaluation.py --rows 200000 --test-sizes 100000 1000000 10000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import f1_score, roc_auc_score
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src import data_processing as dp
+from src import evaluation as ev
+from src import feature_engineering as fe
+
+from bench_retention_models import RAW_PATH, make_dataset
+
+
+def synthetic_scores(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 2, rows)
+    prob = 1 / (1 + np.exp(-(rng.normal(0, 1, rows) + 0.8 * (y - 0.5))))
+    return y, prob
+
+
+def naive_bootstrap(y, prob, n_resamples, seed=0):
+    rng = np.random.default_rng(seed)
+    auc, f1 = [], []
+    for _ in range(n_resamples):
+        idx = rng.integers(0, len(y), len(y))
+        auc.append(roc_auc_score(y[idx], prob[idx]))
+        f1.append(f1_score(y[idx], prob[idx] > 0.5))
+    return np.quantile(auc, [0.025, 0.975]), np.quantile(f1, [0.025, 0.975])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--test-sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--resamples', type=int, default=1000)
+    args = parser.parse_args()
+
+    base = dp.basic_clean(dp.load_data(str(RAW_PATH)))
+    df_feat = fe.create_features(make_dataset(base, args.rows), compact=True)
+    print(f'CV 5 folds, {args.rows:,} filas')
+    for n_jobs in (1, -1):
+        start = time.perf_counter()
+        folds = ev.cross_validate_models(df_feat, n_jobs=n_jobs)
+        print(f'  n_jobs={n_jobs:>2}: {time.perf_counter() - start:.1f}s')
+    print(ev.summarize_folds(folds).round(4).to_string())
+
+    print(f'\nBootstrap, {args.resamples} réplicas')
+    for rows in args.test_sizes:
+        y, prob = synthetic_scores(rows)
+        start = time.perf_counter()
+        report = ev.bootstrap_report(y, prob, n_resamples=args.resamples)
+        print(f'  {rows:>12,} filas: {time.perf_counter() - start:.2f}s')
+    print(report.round(5).to_string(index=False))
+
+    rows = args.test_sizes[0]
+    y, prob = synthetic_scores(rows)
+    report = ev.bootstrap_report(y, prob, n_resamples=200).set_index('metric')
+    start = time.perf_counter()
+    auc_ci, f1_ci = naive_bootstrap(y, prob, 200)
+    print(f'\nIngenuo, {rows:,} filas, 200 réplicas: {time.perf_counter() - start:.2f}s')
+    print(f'  AUC {auc_ci.round(4)} vs {report.loc["roc_auc", ["ci_low", "ci_high"]].to_numpy().round(4)}')
+    print(f'  F1  {f1_ci.round(4)} vs {report.loc["f1", ["ci_low", "ci_high"]].to_numpy().round(4)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Paridad y benchmark del backend polars frente a pandas.
+
+1) Paridad: load_data, basic_clean (normal y compacto), create_features y
+   save_* deben dar exactamente el mismo DataFrame (índice, columnas, dtypes
+   y valores) con ambos backends, sobre el CSV crudo, un CSV "sucio"
+   (espacios, mayúsculas, nulos, duplicados, "Alone", targets variados), la
+   entrada tipada de pyarrow y un directorio de shards.
+2) Benchmark: load → clean → features sobre un CSV sintético grande, función
+   por función y con load + clean fusionados (como hace load_and_clean).
+
+Uso: python benchmarks/bench_polars_backend.py --rows 5000000
+     python benchmarks/bench_polars_backend.py --parity-only
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src import data_processing as dp
+from src import feature_engineering as fe
+from src import polars_backend as pb
+
+from bench_csv_loader import RAW_PATH, make_synthetic_csv, timed
+
+
+def make_dirty_csv(path, rows=5000, seed=7):
+    """CSV con los casos que normaliza basic_clean, duplicados incluidos."""
+    rng = np.random.default_rng(seed)
+    pick = lambda values: rng.choice(np.array(values, dtype=object), rows)
+    df = pd.DataFrame({
+        'Ticket_ID': [f'D{i % (rows // 2)}' for i in range(rows)],
+        'Age': pick(['25', '40', '-3', '17', '18', '59', '60', '130', '', 'abc']),
+        'Ticket_Price': pick(['12.5', '0', '-1', '19.99', '', '7']),
+        'Movie_Genre': pick(['Comedy', ' drama ', 'SCI-FI', 'horror', 'Action', '']),
+        'Seat_Type': pick(['VIP', 'standard', ' Premium', 'vip', 'NA']),
+        'Number_of_Person': pick(['1', '2', 'Alone', '0', '7', '']),
+        'Purchase_Again': pick(['Yes', 'no', 'SI', 'sí', '1', '0', 'y', '']),
+    })
+    df = pd.concat([df, df.sample(frac=0.2, random_state=seed)], ignore_index=True)
+    df.to_csv(path, index=False)
+
+
+def check(label, left, right):
+    pd.testing.assert_frame_equal(left, right, check_exact=True)
+    print(f'  OK  {label} ({len(left):,} filas)')
+
+
+def parity(tmp):
+    dirty = os.path.join(tmp, 'dirty.csv')
+    make_dirty_csv(dirty)
+    shards = os.path.join(tmp, 'shards')
+    os.makedirs(shards)
+    raw = pd.read_csv(RAW_PATH)
+    for i, rows in enumerate(np.array_split(np.arange(len(raw)), 3)):
+        raw.iloc[rows].to_csv(os.path.join(shards, f'sales_{i}.csv'), index=False)
+
+    for name, path in [('crudo', str(RAW_PATH)), ('sucio', dirty), ('shards', shards)]:
+        print(f'[{name}]')
+        df_pd, df_pl = dp.load_data(path, backend='pandas'), dp.load_data(path, backend='polars')
+        check('load_data', df_pd, df_pl)
+        clean_pd = dp.basic_clean(df_pd, backend='pandas')
+        check('basic_clean', clean_pd, dp.basic_clean(df_pd, backend='polars'))
+        check('load+clean en un plan', clean_pd, pb.load_and_clean(path))
+        check(
+            'basic_clean(compact)',
+            dp.basic_clean(df_pd, compact=True, backend='pandas'),
+            dp.basic_clean(df_pd, compact=True, backend='polars'),
+        )
+        check('create_features', fe.create_features(clean_pd, backend='pandas'), fe.create_features(clean_pd, backend='polars'))
+        check(
+            'create_features(compact)',
+            fe.create_features(clean_pd, compact=True, backend='pandas'),
+            fe.create_features(clean_pd, compact=True, backend='polars'),
+        )
+
+    print('[tipado]')
+    typed = dp.load_data(str(RAW_PATH), typed=True)
+    clean_typed = dp.basic_clean(typed, backend='pandas')
+    check('basic_clean', clean_typed, dp.basic_clean(typed, backend='polars'))
+    check('create_features', fe.create_features(clean_typed, backend='pandas'), fe.create_features(clean_typed, backend='polars'))
+
+    print('[save_*]')
+    feat = fe.create_features(dp.basic_clean(dp.load_data(dirty)))
+    out_pd = os.path.join(tmp, 'pd.csv')
+    feat.to_csv(out_pd, index=False)
+    out_pl = pb.save_csv(feat, 'pl.csv', base_dir=tmp)
+    check('CSV releído', pd.read_csv(out_pd), pd.read_csv(out_pl))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--parity-only', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print('Paridad pandas vs polars')
+        parity(tmp)
+        if args.parity_only:
+            return
+
+        path = os.path.join(tmp, 'sales.csv')
+        make_synthetic_csv(path, args.rows)
+        print(f'\nCSV sintético: {args.rows:,} filas, {os.path.getsize(path) / 1e6:,.0f} MB')
+
+        results = {}
+        for backend in ('pandas', 'polars'):
+            df, t_load = timed(lambda: dp.load_data(path, backend=backend))
+            clean, t_clean = timed(lambda: dp.basic_clean(df, backend=backend))
+            _, t_feat = timed(lambda: fe.create_features(clean, backend=backend))
+            results[backend] = (t_load, t_clean, t_feat)
+            del df, clean
+        clean, t_fused = timed(lambda: pb.load_and_clean(path))
+        _, t_feat = timed(lambda: fe.create_features(clean, backend='polars'))
+        results['polars*'] = (t_fused, 0.0, t_feat)
+
+    print(f'{"backend":<10}{"load":>9}{"clean":>9}{"features":>10}{"total":>9}')
+    for backend, (t_load, t_clean, t_feat) in results.items():
+        print(f'{backend:<10}{t_load:>9.2f}{t_clean:>9.2f}{t_feat:>10.2f}{t_load + t_clean + t_feat:>9.2f}')
+    for backend in ('polars', 'polars*'):
+        print(f'Aceleración {backend}: {sum(results["pandas"]) / sum(results[backend]):.1f}x')
+    print('* load + clean en un solo plan polars (ruta de load_and_clean)')
+
+
+if __name__ == '__main__':
+    main()
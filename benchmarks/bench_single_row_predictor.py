@@ -0,0 +1,79 @@
+"""
+Latencia del predictor compilado de propensión frente al pipeline sklearn.
+
+Entrena `train_propensity_model` sobre las features del dataset crudo,
+lo compila con `predictor.compile_logistic` (escalado plegado en los
+coeficientes), comprueba que las probabilidades coinciden y mide:
+- una fila: `pipe.predict_proba` sobre un DataFrame de 1 fila vs.
+  `predict_proba_row` con un dict y con una lista;
+- lotes pequeños (1, 10, 100, 1.000 filas): `pipe.predict_proba` vs.
+  `LogisticPredictor.predict_proba` sobre el arreglo.
+
+Uso: python benchmarks/bench_single_row_predictor.py --repeat 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src import data_processing as dp
+from src import feature_engineering as fe
+from src import modeling as m
+from src.predictor import compile_logistic
+
+RAW_PATH = ROOT / 'data' / 'raw' / 'movie_theatre_sales.csv'
+
+
+def per_call_us(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    df_feat = fe.create_features(dp.basic_clean(dp.load_data(str(RAW_PATH))))
+    pipe, _ = m.train_propensity_model(df_feat)
+    predictor = compile_logistic(pipe)
+    X = df_feat.drop(columns=['Purchase_Again'])
+    arr = X[list(predictor.features)].to_numpy(dtype=float)
+
+    expected = pipe.predict_proba(X)[:, 1]
+    rows = [dict(zip(predictor.features, r)) for r in arr[:1000]]
+    max_diff = max(
+        np.abs(predictor.predict_proba(arr) - expected).max(),
+        max(abs(predictor.predict_proba_row(r) - p) for r, p in zip(rows, expected)),
+    )
+    print(f'Paridad: {len(X):,} filas, diferencia máxima {max_diff:.2e}')
+    assert max_diff < 1e-9
+
+    one_df, one_dict, one_list = X.iloc[:1], rows[0], arr[0].tolist()
+    repeat_pipe = max(args.repeat // 20, 10)
+    t_pipe = per_call_us(lambda: pipe.predict_proba(one_df), repeat_pipe)
+    t_dict = per_call_us(lambda: predictor.predict_proba_row(one_dict), args.repeat)
+    t_list = per_call_us(lambda: predictor.predict_proba_row(one_list), args.repeat)
+    print(f'\n{"una fila":<24}{"µs":>10}{"aceleración":>13}')
+    print(f'{"pipe.predict_proba":<24}{t_pipe:>10.1f}{1:>12.0f}x')
+    print(f'{"predictor (dict)":<24}{t_dict:>10.2f}{t_pipe / t_dict:>12.0f}x')
+    print(f'{"predictor (lista)":<24}{t_list:>10.2f}{t_pipe / t_list:>12.0f}x')
+
+    print(f'\n{"lote":>6}{"pipe µs":>12}{"predictor µs":>14}{"aceleración":>13}')
+    for size in (1, 10, 100, 1000):
+        batch_df, batch_arr = X.iloc[:size], arr[:size]
+        t_pipe = per_call_us(lambda: pipe.predict_proba(batch_df), repeat_pipe)
+        t_pred = per_call_us(lambda: predictor.predict_proba(batch_arr), args.repeat)
+        print(f'{size:>6}{t_pipe:>12.1f}{t_pred:>14.2f}{t_pipe / t_pred:>12.0f}x')
+
+
+if __name__ == '__main__':
+    main()
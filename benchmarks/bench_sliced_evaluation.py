@@ -0,0 +1,70 @@
+"""
+Evaluación por cortes: `evaluation.sliced_report` (una pasada agrupada por
+columna) frente a llamar a `evaluate_classification` una vez por categoría.
+
+Usa el dataset sintético de `bench_retention_models` con un segmento
+aleatorio y probabilidades ruidosas alrededor de la etiqueta; comprueba que
+ambas rutas dan las mismas métricas.
+
+Uso: python benchmarks/bench_sliced_evaluation.py --sizes 100000 1000000 10000000
+"""
+import argparse
+import dataclasses
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from src import data_processing as dp
+from src.evaluation import REPORT_FIELDS, sliced_report
+from src.feature_engineering import AGE_BINS, AGE_LABELS
+from src.modeling import evaluate_classification
+
+from bench_retention_models import RAW_PATH, make_dataset
+
+
+def per_slice_loop(df, y, prob):
+    df = df.assign(age_group=pd.cut(df['Age'], bins=AGE_BINS, labels=AGE_LABELS, include_lowest=True))
+    rows = []
+    for column in ('segment', 'Movie_Genre', 'Seat_Type', 'age_group'):
+        for value, idx in df.groupby(column, observed=True).indices.items():
+            report = evaluate_classification(y[idx], (prob[idx] > 0.5).astype(int), prob[idx])
+            rows.append({'slice': column, 'value': str(value), **dataclasses.asdict(report)})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    base = dp.basic_clean(dp.load_data(str(RAW_PATH)))
+    print(f'{"filas":>12}{"por corte s":>13}{"agrupado s":>12}{"aceleración":>13}{"dif. máx":>11}')
+    for rows in args.sizes:
+        rng = np.random.default_rng(0)
+        df = make_dataset(base, rows)
+        df['segment'] = rng.integers(0, 4, rows)
+        y = df['Purchase_Again'].to_numpy().astype(int)
+        prob = np.clip(rng.normal(0.4 + 0.2 * y, 0.2), 0, 1)
+
+        start = time.perf_counter()
+        loop = per_slice_loop(df, y, prob)
+        t_loop = time.perf_counter() - start
+        start = time.perf_counter()
+        table = sliced_report(df, y, prob)
+        t_grouped = time.perf_counter() - start
+
+        merged = loop.merge(table, on=['slice', 'value'], suffixes=('_loop', ''))
+        diff = max((merged[f'{k}_loop'] - merged[k]).abs().max() for k in REPORT_FIELDS)
+        print(f'{rows:>12,}{t_loop:>13.2f}{t_grouped:>12.2f}{t_loop / t_grouped:>12.1f}x{diff:>11.1e}')
+    print()
+    print(table.round(4).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -34,21 +34,35 @@ sys.path.append(str(ROOT))
 
 from src.pricing_optimization import simulate_pricing_scenarios
 from src import data_processing as dp
-from src import feature_engineering as fe
+from src import storage
+from src import column_store
+from src import rollups
+from src import feature_store
 
 # Paths
 ASSETS_DIR = Path(__file__).parent / 'assets'
 FIG_DIR = ROOT / 'reports' / 'figures'
 LOGO_PNG = FIG_DIR / 'logo_cmsr92.png'
-FEAT_PATH = ROOT / 'data' / 'processed' / 'model_features.csv'
-CLEAN_PATH = ROOT / 'data' / 'processed' / 'cleaned_data.csv'
+PROCESSED_DIR = ROOT / 'data' / 'processed'
+FEAT_PATH = PROCESSED_DIR / 'model_features.csv'
+CLEAN_PATH = PROCESSED_DIR / 'cleaned_data.csv'
+FEAT_PARQUET = PROCESSED_DIR / 'model_features.parquet'
+CLEAN_PARQUET = PROCESSED_DIR / 'cleaned_data.parquet'
+CLEAN_STORE = PROCESSED_DIR / 'cleaned_data.cols'
+ROLLUP_PATH = PROCESSED_DIR / 'rollup_cube.parquet'
 RAW_PATH = ROOT / 'data' / 'raw' / 'movie_theatre_sales.csv'
+FEATURE_STORE_DIR = ROOT / 'data' / 'features'
+CLEAN_ARTIFACTS = (CLEAN_STORE, CLEAN_PARQUET, CLEAN_PATH, RAW_PATH)
+FEAT_ARTIFACTS = (FEAT_PARQUET, FEAT_PATH) + CLEAN_ARTIFACTS
 METRICS_JSON = FIG_DIR / 'model_metrics.json'
 KPIS_JSON = FIG_DIR / 'financial_kpis.json'
 PRICING_CSV = FIG_DIR / 'pricing_results.csv'
 EXPORT_SCRIPT = ROOT / 'presentations' / 'export_figures.py'
 VENV_PY = ROOT / '.venv' / 'Scripts' / 'python.exe'
 
+# Columnas para construir el cubo del tab de negocio si no está precalculado
+BUSINESS_COLUMNS = ['Age', 'Ticket_Price', 'Number_of_Person', 'Purchase_Again', 'Movie_Genre', 'Seat_Type']
+
 # Config
 st.set_page_config(
     page_title='Cinema Subscription Strategy — CMSR92',
@@ -222,20 +236,91 @@ components.html("""
 """, height=0)
 
 # Helper functions
-def load_data():
-    """Cargar y preparar datos"""
+def load_data(columns=None):
+    """Cargar y preparar datos (solo `columns` si se indican).
+
+    Se lee el formato escrito más recientemente; con el almacén mapeado en
+    memoria todas las sesiones comparten una copia.
+    """
     try:
-        if CLEAN_PATH.exists():
-            df = pd.read_csv(CLEAN_PATH)
+        source = dp.latest_cleaned(str(PROCESSED_DIR))
+        if source == str(CLEAN_STORE):
+            df = column_store.open_column_store('cleaned_data', columns=columns, base_dir=str(PROCESSED_DIR))
+        elif source == str(CLEAN_PARQUET):
+            df = storage.load_table('cleaned_data', columns=columns, base_dir=str(PROCESSED_DIR))
+        elif source == str(CLEAN_PATH):
+            df = pd.read_csv(CLEAN_PATH, usecols=columns)
         else:
             df_raw = dp.load_data(str(RAW_PATH))
             df = dp.basic_clean(df_raw)
+            if columns is not None:
+                df = df[columns]
         return df
     except Exception as e:
         st.error(f"Error cargando datos: {e}")
         return None
 
-def load_kpis():
+def load_features():
+    """Cargar features; con Parquet solo se leen las columnas numéricas"""
+    if FEAT_PARQUET.exists():
+        cols = storage.numeric_columns('model_features', base_dir=str(PROCESSED_DIR))
+        return storage.load_table('model_features', columns=cols, base_dir=str(PROCESSED_DIR))
+    if FEAT_PATH.exists():
+        return pd.read_csv(FEAT_PATH)
+    return None
+
+def artifact_fingerprint(*paths):
+    """Huella (mtime, tamaño) de los artefactos; cambia cuando el pipeline los reescribe"""
+    fp = []
+    for path in paths:
+        if not path.exists():
+            fp.append(None)
+        elif path.is_dir():
+            stats = [f.stat() for f in path.rglob('*') if f.is_file()]
+            fp.append((max((x.st_mtime_ns for x in stats), default=0), sum(x.st_size for x in stats)))
+        else:
+            stat = path.stat()
+            fp.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(fp)
+
+# Cachés compartidas entre reruns y sesiones: la huella forma parte de la clave,
+# así se invalidan solas al regenerar los archivos. Los objetos devueltos por
+# cache_resource son compartidos: no mutarlos.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_cube(fingerprint):
+    """Cubo del tab de negocio (se construye desde los datos limpios si no está guardado)"""
+    cube = rollups.load_rollup(base_dir=str(PROCESSED_DIR))
+    if cube is None:
+        df = load_data(BUSINESS_COLUMNS)
+        cube = rollups.build_rollup(df) if df is not None and len(df) > 0 else None
+    return cube
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_features(fingerprint):
+    """Features para segmentación: la versión del almacén que corresponde a los datos limpios"""
+    df_clean = load_data()
+    if df_clean is not None and len(df_clean) > 0:
+        feat_df, _ = feature_store.get_features(df_clean, base_dir=str(FEATURE_STORE_DIR))
+        return feat_df
+    return load_features()
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def fit_segmentation(fingerprint, n_clusters=4):
+    """PCA + KMeans sobre las features numéricas: (pca, kmeans, Z, clusters) o None"""
+    feat_df = cached_features(fingerprint)
+    if feat_df is None or len(feat_df) == 0:
+        return None
+    num_cols = feat_df.select_dtypes(include='number').fillna(0)
+    if len(num_cols.columns) < 2:
+        return None
+    pca = PCA(n_components=2, random_state=42)
+    Z = pca.fit_transform(num_cols)
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=42)
+    clusters = kmeans.fit_predict(num_cols)
+    return pca, kmeans, Z, clusters
+
+@st.cache_data(show_spinner=False)
+def load_kpis(fingerprint=None):
     """Cargar KPIs financieros"""
     try:
         if KPIS_JSON.exists():
@@ -244,7 +329,8 @@ def load_kpis():
     except Exception:
         return None
 
-def load_model_metrics():
+@st.cache_data(show_spinner=False)
+def load_model_metrics(fingerprint=None):
     """Cargar métricas del modelo"""
     try:
         if METRICS_JSON.exists():
@@ -283,10 +369,11 @@ else:
 
 st.markdown('<div class="sub-header">Análisis Data-Driven para Optimización de Precios y Proyecciones Financieras</div>', unsafe_allow_html=True)
 
-# Load data
-df = load_data()
-kpis = load_kpis()
-model_metrics = load_model_metrics()
+# Load data: el tab de negocio usa el cubo precalculado; si no existe se construye una vez
+cube = cached_cube(artifact_fingerprint(ROLLUP_PATH, *CLEAN_ARTIFACTS))
+business = rollups.summarize(cube) if cube is not None else None
+kpis = load_kpis(artifact_fingerprint(KPIS_JSON))
+model_metrics = load_model_metrics(artifact_fingerprint(METRICS_JSON))
 
 # ============================================================================
 # EXECUTIVE DASHBOARD - Vista Principal
@@ -380,21 +467,21 @@ tabs = st.tabs([
 with tabs[0]:
     st.markdown("## 📈 Análisis del Comportamiento de Clientes")
     
-    if df is not None and len(df) > 0:
-        # Estadísticas clave
+    if business is not None and business['n'] > 0:
+        # Estadísticas clave (desde el cubo de agregados)
         st.markdown("### 📊 Datos Clave del Negocio")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            metric_card("Total Transacciones", f"{len(df):,}")
+            metric_card("Total Transacciones", f"{business['n']:,}")
         with col2:
-            avg_ticket = df['Ticket_Price'].mean()
+            avg_ticket = business['avg_ticket']
             metric_card("Precio Promedio Ticket", f"${avg_ticket:.2f}")
         with col3:
-            avg_group = df['Number_of_Person'].mean()
+            avg_group = business['avg_group']
             metric_card("Personas por Compra", f"{avg_group:.1f}")
         with col4:
-            retention = (df['Purchase_Again'].sum() / len(df) * 100)
+            retention = business['retention'] * 100
             metric_card("Tasa de Retención", f"{retention:.1f}%")
         
         st.markdown("---")
@@ -404,19 +491,20 @@ with tabs[0]:
         
         with col_viz1:
             st.markdown("#### Distribución de Precios de Tickets")
-            fig_price = px.histogram(
-                df, 
-                x='Ticket_Price',
-                nbins=30,
+            price_hist = cube.groupby('price_bin')['n'].sum()
+            fig_price = px.bar(
+                x=price_hist.index + rollups.PRICE_BIN_WIDTH / 2,
+                y=price_hist.values,
                 color_discrete_sequence=['#667eea'],
                 labels={
-                    'Ticket_Price': 'Precio del Ticket (USD)', 
-                    'count': 'Frecuencia'
+                    'x': 'Precio del Ticket (USD)', 
+                    'y': 'Frecuencia'
                 }
             )
             fig_price.update_layout(
                 template=plotly_theme(),
                 showlegend=False,
+                bargap=0.05,
                 height=400,
                 xaxis_title='Precio del Ticket (USD)',
                 yaxis_title='Número de Transacciones',
@@ -446,7 +534,7 @@ with tabs[0]:
         
         with col_viz2:
             st.markdown("#### Tamaño de Grupos")
-            group_dist = df['Number_of_Person'].value_counts().sort_index()
+            group_dist = cube.groupby('Number_of_Person')['n'].sum().sort_index()
             fig_group = px.bar(
                 x=group_dist.index,
                 y=group_dist.values,
@@ -485,15 +573,13 @@ with tabs[0]:
         st.markdown("---")
         st.markdown("#### 🎭 Análisis de Preferencias por Género")
         
-        df_revenue = df.copy()
-        df_revenue['revenue_est'] = df_revenue['Ticket_Price'] * df_revenue['Number_of_Person']
-        genre_analysis = df_revenue.groupby('Movie_Genre').agg({
-            'Ticket_ID': 'count',
-            'revenue_est': 'sum',
-            'Ticket_Price': 'mean',
-            'Purchase_Again': 'mean'
+        by_genre = rollups.rollup_by(cube, 'Movie_Genre')
+        genre_analysis = pd.DataFrame({
+            'Transacciones': by_genre['n'],
+            'Revenue Total': by_genre['sum_revenue'],
+            'Precio Promedio': by_genre['avg_price'],
+            'Tasa Retención': by_genre['retention_rate']
         }).round(2)
-        genre_analysis.columns = ['Transacciones', 'Revenue Total', 'Precio Promedio', 'Tasa Retención']
         genre_analysis = genre_analysis.sort_values('Revenue Total', ascending=False)
         
         col_genre1, col_genre2 = st.columns(2)
@@ -582,10 +668,10 @@ with tabs[0]:
         st.markdown("---")
         st.markdown("#### 🪑 Análisis por Tipo de Asiento")
         
-        seat_analysis = df_revenue.groupby('Seat_Type').agg({
-            'Ticket_ID': 'count',
-            'revenue_est': 'sum',
-            'Ticket_Price': 'mean'
+        by_seat = rollups.rollup_by(cube, 'Seat_Type')
+        seat_analysis = pd.DataFrame({
+            'revenue_est': by_seat['sum_revenue'],
+            'Ticket_Price': by_seat['avg_price']
         }).round(2)
         
         fig_seat = go.Figure()
@@ -651,30 +737,18 @@ with tabs[1]:
     st.markdown("Identificación de perfiles de clientes mediante clustering para personalizar la estrategia.")
     
     try:
-        # Cargar features
-        if FEAT_PATH.exists():
-            feat_df = pd.read_csv(FEAT_PATH)
-        elif df is not None:
-            feat_df, _ = fe.build_features_pipeline(df)
-        else:
-            feat_df = None
+        # Cargar features y modelo de segmentación (cacheados por huella de archivos)
+        feat_fp = artifact_fingerprint(*FEAT_ARTIFACTS)
+        feat_df = cached_features(feat_fp)
         
         if feat_df is not None and len(feat_df) > 0:
-            # Preparar datos para clustering
-            num_cols = feat_df.select_dtypes(include=['int64', 'float64']).fillna(0)
+            n_clusters = 4
+            segmentation = fit_segmentation(feat_fp, n_clusters)
             
-            if len(num_cols.columns) >= 2:
-                # PCA para visualización
-                pca = PCA(n_components=2, random_state=42)
-                Z = pca.fit_transform(num_cols)
-                
-                # KMeans clustering
-                n_clusters = 4
-                kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=42)
-                clusters = kmeans.fit_predict(num_cols)
-                
-                # Añadir clusters al dataframe
-                feat_df['Segmento'] = clusters
+            if segmentation is not None:
+                # PCA para visualización y clusters de KMeans
+                pca, kmeans, Z, clusters = segmentation
+                segments = pd.Series(clusters, index=feat_df.index, name='Segmento')
                 
                 # Visualización de segmentos
                 st.markdown("### 🎯 Visualización de Segmentos (PCA)")
@@ -743,10 +817,10 @@ with tabs[1]:
                 available_features = [f for f in key_features if f in feat_df.columns]
                 
                 if available_features:
-                    profiles = feat_df.groupby('Segmento')[available_features].mean().round(2)
+                    profiles = feat_df[available_features].groupby(segments).mean().round(2)
                     
                     # Añadir tamaño de cada segmento
-                    profiles['Tamaño'] = feat_df.groupby('Segmento').size()
+                    profiles['Tamaño'] = segments.value_counts()
                     profiles['% del Total'] = (profiles['Tamaño'] / len(feat_df) * 100).round(1)
                     
                     # Mostrar en columnas
@@ -1099,7 +1173,7 @@ with tabs[3]:
     projection_data = []
     
     # Año 0 (baseline sin suscripción)
-    baseline_revenue = len(df) * df['Ticket_Price'].mean() * df['Number_of_Person'].mean() if df is not None else 150000
+    baseline_revenue = business['n'] * business['avg_ticket'] * business['avg_group'] if business is not None else 150000
     
     current_price = price_selected
     current_subs = subs_selected
@@ -1131,7 +1205,7 @@ with tabs[3]:
             sub_revenue = subs * price
             
             # Revenue tradicional decrece con suscripción (asumimos 50% de suscriptores hubieran venido igual)
-            trad_revenue = baseline_revenue * (1 - 0.5 * subs / (subs + baseline_revenue / (df['Ticket_Price'].mean() * df['Number_of_Person'].mean()) if df is not None else 1000))
+            trad_revenue = baseline_revenue * (1 - 0.5 * subs / (subs + baseline_revenue / (business['avg_ticket'] * business['avg_group']) if business is not None else 1000))
             
             total_revenue = sub_revenue + trad_revenue
             total_costs = fixed_costs + (variable_cost * subs)
@@ -1361,14 +1435,22 @@ with tabs[4]:
     files_to_check = [
         ('Raw Data', RAW_PATH),
         ('Cleaned Data', CLEAN_PATH),
+        ('Cleaned Data (Parquet)', CLEAN_PARQUET),
+        ('Cleaned Data (mmap)', CLEAN_STORE),
+        ('Rollup Cube', PROCESSED_DIR / 'rollup_cube.parquet'),
         ('Features', FEAT_PATH),
+        ('Features (Parquet)', FEAT_PARQUET),
+        ('Feature Store', FEATURE_STORE_DIR),
         ('Model Metrics', METRICS_JSON),
         ('Financial KPIs', KPIS_JSON)
     ]
     
     for name, path in files_to_check:
         exists = path.exists()
-        size = path.stat().st_size if exists else 0
+        if exists and path.is_dir():
+            size = sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+        else:
+            size = path.stat().st_size if exists else 0
         status_data.append({
             'Archivo': name,
             'Estado': '✅ Disponible' if exists else '❌ Faltante',
@@ -1383,7 +1465,7 @@ with tabs[4]:
     col_info1, col_info2, col_info3 = st.columns(3)
     
     with col_info1:
-        st.metric("Registros en Dataset", f"{len(df):,}" if df is not None else "N/A")
+        st.metric("Registros en Dataset", f"{business['n']:,}" if business is not None else "N/A")
     with col_info2:
         st.metric("Python Env", "Activo" if VENV_PY.exists() else "Sistema")
     with col_info3:
@@ -14,10 +14,17 @@ import plotly.graph_objects as go
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
+from src.data_processing import latest_cleaned
 from src.pricing_optimization import simulate_pricing_scenarios
+from src import storage
+from src import column_store
 
 FIG_DIR = ROOT / 'reports' / 'figures'
-DATA_PATH = ROOT / 'data' / 'processed' / 'cleaned_data.csv'
+PROCESSED_DIR = ROOT / 'data' / 'processed'
+DATA_PATH = PROCESSED_DIR / 'cleaned_data.csv'
+DATA_PARQUET = PROCESSED_DIR / 'cleaned_data.parquet'
+DATA_STORE = PROCESSED_DIR / 'cleaned_data.cols'
+FIGURE_COLUMNS = ['Ticket_Price', 'Number_of_Person']
 KPIS_JSON = FIG_DIR / 'financial_kpis.json'
 METRICS_JSON = FIG_DIR / 'model_metrics.json'
 PRICING_CSV = FIG_DIR / 'pricing_results.csv'
@@ -25,10 +32,16 @@ PRICING_CSV = FIG_DIR / 'pricing_results.csv'
 FIG_DIR.mkdir(parents=True, exist_ok=True)
 
 def export_main_figures():
-    # Cargar datos
-    if not DATA_PATH.exists():
+    # Cargar datos (solo las columnas de las figuras) del formato más reciente
+    source = latest_cleaned(str(PROCESSED_DIR))
+    if source == str(DATA_STORE):
+        df = column_store.open_column_store('cleaned_data', columns=FIGURE_COLUMNS, base_dir=str(PROCESSED_DIR))
+    elif source == str(DATA_PARQUET):
+        df = storage.load_table('cleaned_data', columns=FIGURE_COLUMNS, base_dir=str(PROCESSED_DIR))
+    elif source == str(DATA_PATH):
+        df = pd.read_csv(DATA_PATH, usecols=FIGURE_COLUMNS)
+    else:
         raise FileNotFoundError(f"No se encuentra el archivo de datos: {DATA_PATH}")
-    df = pd.read_csv(DATA_PATH)
 
     # Figura 1: Histograma de precios
     fig_price = px.histogram(
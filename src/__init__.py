@@ -4,9 +4,21 @@ Autor: CMSR92
 """
 
 __all__ = [
+    "backends",
+    "cache",
+    "column_store",
     "data_processing",
+    "dtypes",
+    "evaluation",
     "feature_engineering",
+    "feature_store",
     "modeling",
+    "polars_backend",
+    "predictor",
+    "registry",
     "pricing_optimization",
+    "rollups",
+    "scoring",
+    "storage",
     "visualization",
 ]
@@ -0,0 +1,27 @@
+"""Selección del motor de ejecución (en español)
+
+`load_data`, `basic_clean`, `create_features` y `save_*` aceptan
+`backend="pandas"` (por defecto) o `backend="polars"` (motor lazy
+multihilo, ver `src.polars_backend`). Sin argumento se usa la variable de
+entorno `CINE_BACKEND`.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import os
+from typing import Optional
+
+BACKEND_ENV = "CINE_BACKEND"
+BACKENDS = ("pandas", "polars")
+DEFAULT_BACKEND = "pandas"
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Motor a usar: el argumento, o `CINE_BACKEND`, o pandas.
+
+    Raises:
+        ValueError: si el motor no es uno de `BACKENDS`.
+    """
+    name = (backend or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconocido {name!r}; opciones: {BACKENDS}")
+    return name
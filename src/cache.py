@@ -0,0 +1,180 @@
+"""Memoización del pipeline (en español)
+
+Caché en disco (y en memoria del proceso) para load → clean → features,
+indexada por la huella de los archivos crudos (tamaño, mtime y hash de contenido)
+más una versión del código de transformación.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+import joblib
+import pandas as pd
+
+from . import column_store, data_processing, feature_engineering, storage
+
+CACHE_DIR = os.path.join("data", "cache")
+MAX_CACHE_BYTES = 512 * 1024 ** 2
+MEMORY_ENTRIES = 8
+
+# Hash de contenido ya calculado por (ruta, tamaño, mtime): evita releer el archivo
+_content_hashes: Dict[Tuple[str, int, int], str] = {}
+_memory: "OrderedDict[str, Any]" = OrderedDict()
+
+
+def file_fingerprint(path: str) -> str:
+    """Huella de un archivo: tamaño + mtime + blake2b del contenido.
+
+    El hash de contenido se recuerda mientras tamaño y mtime no cambien, así
+    una llamada repetida solo hace un `stat`.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró el archivo en {path}")
+    st = os.stat(path)
+    stat_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _content_hashes.get(stat_key)
+    if digest is None:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        _content_hashes[stat_key] = digest
+    return f"{st.st_size}-{st.st_mtime_ns}-{digest}"
+
+
+def sources_fingerprint(raw_path: str) -> str:
+    """Huella de la entrada cruda: un archivo, un directorio de shards o un glob.
+
+    Combina ruta y `file_fingerprint` de cada archivo de
+    `data_processing.resolve_sources`, así añadir, quitar o cambiar un shard
+    invalida la caché.
+    """
+    return ";".join(f"{p}:{file_fingerprint(p)}" for p in data_processing.resolve_sources(raw_path))
+
+
+def code_version(*modules) -> str:
+    """Versión del código de transformación: hash del fuente de los módulos y de pandas."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(pd.__version__.encode())
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _cache_key(*parts: str) -> str:
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _entry_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{key}.joblib")
+
+
+def evict(cache_dir: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES) -> int:
+    """Elimina las entradas menos usadas hasta quedar bajo `max_bytes`. Devuelve cuántas borró."""
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".joblib"):
+            st = os.stat(os.path.join(cache_dir, name))
+            entries.append((st.st_mtime_ns, st.st_size, name))
+    total = sum(e[1] for e in entries)
+    removed = 0
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+        removed += 1
+    return removed
+
+
+def memoize(
+    key: str,
+    compute: Callable[[], Any],
+    cache_dir: str = CACHE_DIR,
+    max_bytes: int = MAX_CACHE_BYTES,
+) -> Any:
+    """Devuelve el valor cacheado para `key` o lo calcula y lo guarda.
+
+    Busca primero en memoria del proceso y luego en disco. Cada acierto en
+    disco actualiza el mtime de la entrada, que sirve de orden LRU para `evict`.
+    """
+    if key in _memory:
+        _memory.move_to_end(key)
+        return _memory[key]
+
+    path = _entry_path(key, cache_dir)
+    if os.path.exists(path):
+        value = joblib.load(path)
+        os.utime(path)
+    else:
+        value = compute()
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, path)
+        evict(cache_dir, max_bytes)
+
+    _memory[key] = value
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+    return value
+
+
+def cached_load_and_clean(
+    raw_path: str = data_processing.RAW_FILE_DEFAULT,
+    fmt: str = "csv",
+    typed: bool = False,
+    cache_dir: str = CACHE_DIR,
+) -> Tuple[pd.DataFrame, str]:
+    """`load_and_clean` memoizado: si el crudo y el código no cambiaron, no recalcula.
+
+    El DataFrame devuelto se comparte entre llamadas; cópialo antes de mutarlo.
+    """
+    key = _cache_key(
+        "clean",
+        sources_fingerprint(raw_path),
+        code_version(data_processing, storage, column_store),
+        fmt,
+        str(typed),
+    )
+    df_clean, saved = memoize(key, lambda: data_processing.load_and_clean(raw_path, fmt=fmt, typed=typed), cache_dir)
+    if not os.path.exists(saved):
+        # El artefacto se borró: se reescribe desde la caché sin recalcular
+        if fmt == "parquet":
+            saved = data_processing.save_processed(df_clean, "cleaned_data.parquet", partition_cols=["Movie_Genre"])
+        elif fmt == "mmap":
+            saved = data_processing.write_column_store(df_clean, "cleaned_data", base_dir=data_processing.PROCESSED_DIR)
+        else:
+            saved = data_processing.save_processed(df_clean, "cleaned_data.csv")
+    return df_clean, saved
+
+
+def cached_features_pipeline(
+    raw_path: str = data_processing.RAW_FILE_DEFAULT,
+    fmt: str = "csv",
+    typed: bool = False,
+    cache_dir: str = CACHE_DIR,
+) -> Tuple[pd.DataFrame, str]:
+    """load → clean → `build_features_pipeline` memoizado sobre la huella de los crudos."""
+    key = _cache_key(
+        "features",
+        sources_fingerprint(raw_path),
+        code_version(data_processing, feature_engineering, storage),
+        fmt,
+        str(typed),
+    )
+
+    def compute():
+        df_clean, _ = cached_load_and_clean(raw_path, fmt=fmt, typed=typed, cache_dir=cache_dir)
+        return feature_engineering.build_features_pipeline(df_clean, fmt=fmt)
+
+    feat, saved = memoize(key, compute, cache_dir)
+    if not os.path.exists(saved):
+        saved = feature_engineering.save_features(feat, os.path.basename(saved))
+    return feat, saved
@@ -0,0 +1,128 @@
+"""Almacén de columnas mapeadas en memoria (en español)
+
+Escribe las columnas procesadas una sola vez como arreglos .npy (numéricas
+tal cual y categóricas codificadas como diccionario) y las abre en solo
+lectura con `mmap`, sin copiar: todas las sesiones del dashboard y los
+scripts de exportación comparten la misma copia física (page cache del SO).
+Autor: CMSR92
+"""
+from __future__ import annotations
+import json
+import os
+import shutil
+from typing import List, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+PROCESSED_DIR = os.path.join("data", "processed")
+META_FILE = "meta.json"
+
+
+def store_path(name: str, base_dir: str = PROCESSED_DIR) -> str:
+    """Directorio del almacén de una tabla (p. ej. data/processed/cleaned_data.cols)."""
+    return os.path.join(base_dir, f"{name}.cols")
+
+
+def _smallest_code_dtype(n_categories: int):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def write_column_store(df: pd.DataFrame, name: str = "cleaned_data", base_dir: str = PROCESSED_DIR) -> str:
+    """Escribe `df` como un arreglo .npy por columna y devuelve el directorio.
+
+    - Numéricas y bool: se guardan con su dtype
+    - Categóricas y texto: códigos enteros (el menor dtype posible) + un .npy
+      con el diccionario de valores
+
+    La publicación es atómica: se escribe en un directorio temporal y se
+    renombra, así los lectores con mapas abiertos conservan la versión previa.
+    """
+    path = store_path(name, base_dir)
+    tmp_path = path + ".tmp"
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        s = df[col]
+        entry = {"name": col, "file": f"c{i}.npy"}
+        if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            arr = np.ascontiguousarray(s.to_numpy())
+            entry["kind"] = "numeric"
+        else:
+            cat = s.astype("category") if not isinstance(s.dtype, pd.CategoricalDtype) else s
+            categories = cat.cat.categories
+            arr = cat.cat.codes.to_numpy().astype(_smallest_code_dtype(len(categories)))
+            entry["kind"] = "dictionary"
+            entry["categories_file"] = f"c{i}.categories.npy"
+            np.save(os.path.join(tmp_path, entry["categories_file"]), categories.to_numpy().astype(str))
+        entry["dtype"] = str(arr.dtype)
+        np.save(os.path.join(tmp_path, entry["file"]), arr)
+        columns.append(entry)
+
+    with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"rows": int(len(df)), "columns": columns}, f, indent=2)
+
+    old_path = path + ".old"
+    if os.path.isdir(old_path):
+        shutil.rmtree(old_path)
+    if os.path.isdir(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if os.path.isdir(old_path):
+        shutil.rmtree(old_path)
+    return path
+
+
+def store_columns(name: str = "cleaned_data", base_dir: str = PROCESSED_DIR) -> List[str]:
+    """Nombres de columnas disponibles en el almacén."""
+    with open(os.path.join(store_path(name, base_dir), META_FILE), "r", encoding="utf-8") as f:
+        return [c["name"] for c in json.load(f)["columns"]]
+
+
+def open_column_store(
+    name: str = "cleaned_data",
+    columns: Optional[Sequence[str]] = None,
+    base_dir: str = PROCESSED_DIR,
+) -> pd.DataFrame:
+    """Abre el almacén como DataFrame respaldado por mapas de memoria de solo lectura.
+
+    Las columnas numéricas y los códigos de las categóricas no se copian. El
+    diccionario de valores sí se materializa por proceso, por lo que conviene
+    proyectar fuera columnas de alta cardinalidad como `Ticket_ID`.
+
+    Args:
+        name: Nombre de la tabla.
+        columns: Columnas a abrir (None = todas).
+        base_dir: Carpeta del almacén.
+    Raises:
+        FileNotFoundError: si el almacén no existe.
+        KeyError: si se piden columnas inexistentes.
+    """
+    path = store_path(name, base_dir)
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError(f"No se encontró el almacén de columnas en {path}")
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    entries = {c["name"]: c for c in meta["columns"]}
+    wanted = list(columns) if columns is not None else list(entries)
+    missing = [c for c in wanted if c not in entries]
+    if missing:
+        raise KeyError(f"Columnas inexistentes en el almacén: {missing}")
+
+    data = {}
+    for col in wanted:
+        entry = entries[col]
+        arr = np.load(os.path.join(path, entry["file"]), mmap_mode="r")
+        if entry["kind"] == "dictionary":
+            categories = np.load(os.path.join(path, entry["categories_file"]))
+            data[col] = pd.Categorical.from_codes(arr, categories=categories)
+        else:
+            data[col] = arr
+    return pd.DataFrame(data, copy=False)
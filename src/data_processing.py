@@ -4,30 +4,196 @@ Funciones para cargar, validar, limpiar y guardar datos del proyecto.
 Autor: CMSR92
 """
 from __future__ import annotations
+import csv
+import glob
+import io
+import json
 import os
-from typing import Tuple
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from .backends import resolve_backend
+from .column_store import write_column_store
+from .dtypes import compact_dtypes
+from .rollups import build_rollup, load_rollup, save_rollup, update_rollup
+from .storage import append_table, save_table
+
 RAW_FILE_DEFAULT = os.path.join("data", "raw", "movie_theatre_sales.csv")
 PROCESSED_DIR = os.path.join("data", "processed")
+INGEST_STATE_FILE = "_ingest_state.json"
+INGEST_INDEX_FILE = "_ingest_index.npy"
+
+# Esquema declarado del CSV crudo (modo tipado de `load_data`)
+GENRE_CATEGORIES = ["Action", "Comedy", "Drama", "Horror", "Sci-Fi"]
+SEAT_CATEGORIES = ["Premium", "Standard", "Vip"]
+TRUE_VALUES = ["yes", "1", "true", "y", "si", "sí"]
+# Las lecturas por bloques leen texto: inferir tipos por bloque cambia el
+# resultado (p. ej. un bloque con target solo "1"/"0" y vacíos sería float)
+STREAM_DTYPE = str
+# Tabla limpia que lee el dashboard: solo sus escritores actualizan el cubo de agregados
+CLEANED_TABLE = "cleaned_data"
+GROUP_SIZE_TOKENS = {"alone": 1}
+# "dictionary": se lee como texto diccionario y se decodifica por valor único;
+# "numeric": se lee como texto y se convierte a float64 (NaN si no es un número)
+RAW_SCHEMA = {
+    "Ticket_ID": "string",
+    "Age": "numeric",
+    "Ticket_Price": "numeric",
+    "Movie_Genre": "dictionary",
+    "Seat_Type": "dictionary",
+    "Number_of_Person": "dictionary",
+    "Purchase_Again": "dictionary",
+}
 
 
-def load_data(path: str = RAW_FILE_DEFAULT) -> pd.DataFrame:
+def resolve_sources(path: str) -> List[str]:
+    """Lista ordenada de CSV a leer: un archivo, un directorio (sus *.csv) o un glob."""
+    if os.path.isdir(path):
+        sources = sorted(glob.glob(os.path.join(path, "*.csv")))
+    elif glob.has_magic(path):
+        sources = sorted(glob.glob(path))
+    else:
+        sources = [path] if os.path.exists(path) else []
+    if not sources:
+        raise FileNotFoundError(
+            f"No se encontró el archivo en {path}. Coloca el dataset en data/raw/movie_theatre_sales.csv"
+        )
+    return sources
+
+
+def load_data(path: str = RAW_FILE_DEFAULT, typed: bool = False, backend: Optional[str] = None) -> pd.DataFrame:
     """Carga el dataset desde CSV.
 
     Args:
-        path: Ruta al CSV crudo.
+        path: Ruta al CSV crudo, a un directorio de shards (un CSV por cine y
+            día) o un glob como "data/raw/sales_*.csv"; los shards se concatenan.
+        typed: Si True, parsea con el lector multihilo de pyarrow según
+            `RAW_SCHEMA` (ver `_read_typed`).
+        backend: "pandas" o "polars" (None = `CINE_BACKEND`, ver
+            `src.backends`); con polars se ignora `typed`.
     Returns:
         DataFrame con los datos cargados.
     Raises:
         FileNotFoundError: si el archivo no existe.
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(
-            f"No se encontró el archivo en {path}. Coloca el dataset en data/raw/movie_theatre_sales.csv"
-        )
-    df = pd.read_csv(path)
-    return df
+    if resolve_backend(backend) == "polars":
+        from . import polars_backend
+
+        return polars_backend.load_data(path)
+    sources = resolve_sources(path)
+    reader = _read_typed if typed else pd.read_csv
+    if len(sources) == 1:
+        return reader(sources[0])
+    return pd.concat([reader(p) for p in sources], ignore_index=True)
+
+
+def _decode_dictionary(col, mapper, dtype) -> np.ndarray:
+    """Traduce una columna diccionario de pyarrow aplicando `mapper` solo a sus valores únicos."""
+    parts = []
+    for chunk in col.chunks:
+        values = np.array([mapper(v) for v in chunk.dictionary.to_pylist()] + [mapper(None)], dtype=dtype)
+        # Los nulos apuntan a la última posición (mapper(None))
+        idx = chunk.indices.fill_null(len(values) - 1).to_numpy()
+        parts.append(values[idx])
+    if not parts:
+        return np.empty(0, dtype=dtype)
+    return np.concatenate(parts)
+
+
+def _group_size(token):
+    if token is None:
+        return np.nan
+    token = token.strip().lower()
+    if token in GROUP_SIZE_TOKENS:
+        return GROUP_SIZE_TOKENS[token]
+    try:
+        return float(token)
+    except ValueError:
+        return np.nan
+
+
+# Número decimal con signo y exponente opcionales (lo que acepta pd.to_numeric)
+_NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+
+def _coerce_numeric(col):
+    """Texto de pyarrow a float64 con nulo donde no hay un número (como `errors="coerce"`)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    col = pc.utf8_trim_whitespace(col)
+    valid = pc.match_substring_regex(col, _NUMBER_PATTERN)
+    return pc.cast(pc.if_else(valid, col, pa.scalar(None, pa.string())), pa.float64())
+
+
+def _read_header(path: str) -> List[str]:
+    """Nombres de columna del CSV sin espacios alrededor."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return [c.strip() for c in next(csv.reader(f), [])]
+
+
+def _read_typed(path: str) -> pd.DataFrame:
+    """Lee el CSV crudo en una sola pasada con pyarrow (multihilo) y tipos declarados.
+
+    - Numéricas leídas como texto y convertidas a float64; un valor no
+      numérico queda NaN y `basic_clean` descarta la fila, como en la ruta pandas
+    - Género, asiento, grupo y target leídos como diccionario: la
+      normalización (strip/title, "Alone" → 1, Yes/No → 1/0) se aplica solo a
+      los valores únicos, no fila a fila
+    - Categóricas con categorías declaradas (`GENRE_CATEGORIES`,
+      `SEAT_CATEGORIES`); valores nuevos se añaden al final
+
+    A diferencia de la ruta pandas, tokens como "Alone" en `Number_of_Person`
+    se traducen al parsear en vez de convertirse en NaN y descartar la fila.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    arrow_types = {
+        "string": pa.string(),
+        "numeric": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+    }
+    # La cabecera se lee aparte y sin espacios: así los tipos declarados se
+    # aplican también con nombres como " Movie_Genre"
+    names = _read_header(path)
+    missing = [c for c in essential_columns if c not in names]
+    if missing:
+        raise ValueError(f"Faltan columnas esenciales: {missing}")
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True, column_names=names, skip_rows=1),
+        convert_options=pacsv.ConvertOptions(
+            column_types={c: arrow_types[t] for c, t in RAW_SCHEMA.items()},
+            strings_can_be_null=True,
+        ),
+    )
+
+    out = {}
+    for name in names:
+        col = table.column(name)
+        if name in ("Movie_Genre", "Seat_Type"):
+            declared = GENRE_CATEGORIES if name == "Movie_Genre" else SEAT_CATEGORIES
+            observed = {v.strip().title() for c in col.chunks for v in c.dictionary.to_pylist() if v is not None}
+            categories = declared + sorted(observed - set(declared))
+            lookup = {c: i for i, c in enumerate(categories)}
+            codes = _decode_dictionary(col, lambda v: -1 if v is None else lookup[v.strip().title()], np.int16)
+            out[name] = pd.Categorical.from_codes(codes, categories=categories)
+        elif name == "Number_of_Person":
+            out[name] = _decode_dictionary(col, _group_size, np.float64)
+        elif name == "Purchase_Again":
+            out[name] = _decode_dictionary(
+                col, lambda v: v is not None and v.strip().lower() in TRUE_VALUES, np.int8
+            )
+        elif RAW_SCHEMA.get(name) == "numeric":
+            out[name] = _coerce_numeric(col).to_numpy()
+        else:
+            out[name] = col.to_pandas()
+    return pd.DataFrame(out)
 
 
 essential_columns = [
@@ -40,15 +206,12 @@ essential_columns = [
 ]
 
 
-def basic_clean(df: pd.DataFrame) -> pd.DataFrame:
-    """Aplica limpieza básica y validaciones mínimas.
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Normaliza columnas, tipos, categóricas y target sobre un bloque de filas.
 
-    - Normaliza nombres de columnas
-    - Elimina duplicados
-    - Quita espacios y rellena valores simples
-    - Convierte tipos esperados
+    No elimina duplicados ni nulos: se comparte entre `basic_clean` y el modo
+    por bloques (`clean_in_chunks`), donde la deduplicación es global.
     """
-    df = df.copy()
     # Normaliza columnas
     df.columns = [c.strip() for c in df.columns]
 
@@ -62,34 +225,503 @@ def basic_clean(df: pd.DataFrame) -> pd.DataFrame:
     df["Ticket_Price"] = pd.to_numeric(df["Ticket_Price"], errors="coerce").clip(lower=0)
     df["Number_of_Person"] = pd.to_numeric(df["Number_of_Person"], errors="coerce").clip(lower=1)
 
-    # Categóricas
+    # Categóricas (si ya llegan como category normalizada no se tocan)
     for c in ["Movie_Genre", "Seat_Type"]:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            cats = df[c].cat.categories
+            if (cats.astype(str).str.strip().str.title() == cats).all():
+                continue
         df[c] = df[c].astype(str).str.strip().str.title()
 
     # Target binario
-    if df["Purchase_Again"].dtype != "int64" and df["Purchase_Again"].dtype != "int32":
+    if df["Purchase_Again"].dtype == bool:
+        df["Purchase_Again"] = df["Purchase_Again"].astype("int8")
+    elif not pd.api.types.is_integer_dtype(df["Purchase_Again"]):
         df["Purchase_Again"] = (
-            df["Purchase_Again"].astype(str).str.lower().isin(["yes", "1", "true", "y", "si", "sí"]).astype(int)
+            df["Purchase_Again"].astype(str).str.lower().isin(TRUE_VALUES).astype(int)
         )
+    return df
+
+
+def basic_clean(df: pd.DataFrame, compact: bool = False, backend: Optional[str] = None) -> pd.DataFrame:
+    """Aplica limpieza básica y validaciones mínimas.
+
+    - Normaliza nombres de columnas
+    - Elimina duplicados
+    - Quita espacios y rellena valores simples
+    - Convierte tipos esperados
+    - Con `compact=True`, tipos compactos (ver `src.dtypes.compact_dtypes`)
+
+    `backend="polars"` ejecuta lo mismo con polars (ver `src.backends`).
+    """
+    if resolve_backend(backend) == "polars":
+        from . import polars_backend
+
+        return polars_backend.basic_clean(df, compact=compact)
+    df = _normalize(df.copy())
 
     # Duplicados y nulos
     df = df.drop_duplicates().reset_index(drop=True)
     df = df.dropna(subset=["Age", "Ticket_Price", "Number_of_Person"])  # hard drop mínimos
 
+    if compact:
+        df = compact_dtypes(df, stage="clean")
     return df
 
 
-def save_processed(df: pd.DataFrame, filename: str = "cleaned_data.csv") -> str:
-    """Guarda DataFrame procesado en data/processed y devuelve la ruta guardada."""
+class _HashIndex:
+    """Conjunto de hashes uint64 como niveles ordenados (estilo LSM).
+
+    Cada `add` inserta un arreglo ordenado y fusiona niveles de tamaño similar,
+    así la inserción cuesta O(n log n) amortizado y la búsqueda usa
+    `searchsorted` sobre O(log n) niveles.
+    """
+
+    def __init__(self) -> None:
+        self.levels: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(a) for a in self.levels)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        for level in self.levels:
+            pos = np.searchsorted(level, hashes)
+            pos[pos == len(level)] = 0
+            found |= level[pos] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        self.levels.append(np.unique(hashes.astype(np.uint64, copy=False)))
+        while len(self.levels) > 1 and len(self.levels[-2]) <= 2 * len(self.levels[-1]):
+            last = self.levels.pop()
+            self.levels[-1] = np.union1d(self.levels[-1], last)
+
+    def save(self, path: str) -> None:
+        """Persiste el índice como un único arreglo ordenado (.npy)."""
+        merged = np.unique(np.concatenate(self.levels)) if self.levels else np.empty(0, dtype=np.uint64)
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, merged)
+        os.replace(tmp_path, path)
+        self.levels = [merged] if len(merged) else []
+
+    @classmethod
+    def load(cls, path: str) -> "_HashIndex":
+        index = cls()
+        if os.path.exists(path):
+            arr = np.load(path)
+            if len(arr):
+                index.levels = [arr]
+        return index
+
+
+def _is_cleaned_table(filename: str) -> bool:
+    """True si `filename` es la tabla limpia del dashboard (cualquier formato)."""
+    return os.path.splitext(os.path.basename(filename))[0] == CLEANED_TABLE
+
+
+def _normalize_block(chunk: pd.DataFrame) -> pd.DataFrame:
+    chunk = _normalize(chunk)
+    # El dtype inferido varía por bloque (int/float): se fija para hash y salida,
+    # así los fragmentos que se añaden a una tabla Parquet comparten esquema
+    return chunk.astype({"Age": "float64", "Ticket_Price": "float64", "Number_of_Person": "float64"})
+
+
+def _row_hashes(chunk: pd.DataFrame, key: Optional[str] = None) -> np.ndarray:
+    """Hash de 64 bits por fila normalizada (o por `key`), estable entre bloques."""
+    if key is None:
+        return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    return pd.util.hash_pandas_object(chunk[key], index=False).to_numpy()
+
+
+def _dedupe_block(chunk: pd.DataFrame, seen: _HashIndex, key: Optional[str] = None) -> pd.DataFrame:
+    """Normaliza un bloque y quita filas repetidas en el bloque o ya vistas en `seen`.
+
+    Con `key=None` el hash es de la fila completa (misma semántica que
+    `drop_duplicates`); con `key="Ticket_ID"` se deduplica por esa columna.
+    Las filas nuevas se registran en `seen`.
+    """
+    chunk = _normalize_block(chunk)
+    hashes = _row_hashes(chunk, key)
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    keep &= ~seen.contains(hashes)
+    seen.add(hashes[keep])
+
+    return chunk[keep].dropna(subset=["Age", "Ticket_Price", "Number_of_Person"])
+
+
+def clean_in_chunks(
+    raw_path: str = RAW_FILE_DEFAULT,
+    filename: str = "cleaned_data.csv",
+    chunksize: int = 100_000,
+) -> Tuple[int, str]:
+    """Limpieza en streaming: lee el CSV crudo por bloques y escribe incrementalmente.
+
+    Aplica la misma normalización que `basic_clean` a cada bloque y lo añade al
+    archivo de salida en data/processed, de modo que la memoria pico depende del
+    tamaño de bloque y no del archivo. Los duplicados se detectan entre bloques
+    con un hash de 64 bits por fila (8 bytes por fila única), conservando la
+    primera aparición como `drop_duplicates`. El resultado coincide con el de
+    `load_and_clean` (salvo colisiones de hash, despreciables a 64 bits).
+
+    Args:
+        raw_path: Ruta al CSV crudo.
+        filename: Nombre del archivo de salida en data/processed.
+        chunksize: Filas por bloque.
+    Returns:
+        (filas_escritas, ruta_archivo)
+    """
+    if not os.path.exists(raw_path):
+        raise FileNotFoundError(
+            f"No se encontró el archivo en {raw_path}. Coloca el dataset en data/raw/movie_theatre_sales.csv"
+        )
     os.makedirs(PROCESSED_DIR, exist_ok=True)
     path = os.path.join(PROCESSED_DIR, filename)
-    df.to_csv(path, index=False)
+    tmp_path = path + ".tmp"
+
+    seen = _HashIndex()
+    cube = None
+    written = 0
+    header = True
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        for chunk in pd.read_csv(raw_path, chunksize=chunksize, dtype=STREAM_DTYPE):
+            chunk = _dedupe_block(chunk, seen)
+            chunk.to_csv(out, index=False, header=header)
+            header = False
+            written += len(chunk)
+            cube = update_rollup(cube, chunk)
+    os.replace(tmp_path, path)
+    if _is_cleaned_table(filename):
+        save_rollup(cube if cube is not None else build_rollup(pd.DataFrame(columns=essential_columns)), base_dir=PROCESSED_DIR)
+    return written, path
+
+
+_HASH_ROW = np.dtype([("hash", "<u8"), ("row", "<i8")])
+
+
+def _first_rows(partition_path: str) -> np.ndarray:
+    """Filas (número global) de la primera aparición de cada hash de una partición."""
+    pairs = np.fromfile(partition_path, dtype=_HASH_ROW)
+    order = np.lexsort((pairs["row"], pairs["hash"]))
+    hashes = pairs["hash"][order]
+    first = np.ones(len(hashes), dtype=bool)
+    first[1:] = hashes[1:] != hashes[:-1]
+    return pairs["row"][order][first]
+
+
+def clean_out_of_core(
+    raw_path: str = RAW_FILE_DEFAULT,
+    filename: str = "cleaned_data.csv",
+    chunksize: int = 100_000,
+    n_partitions: int = 16,
+    work_dir: Optional[str] = None,
+) -> Tuple[int, str]:
+    """Limpieza con deduplicación en memoria externa, para historiales que no caben en RAM.
+
+    1. Lee el CSV por bloques, normaliza y calcula un hash de 64 bits por
+       fila; los pares (hash, fila) se reparten en `n_partitions` archivos
+       según `hash % n_partitions`.
+    2. Deduplica cada partición por separado (todas las copias de una fila
+       caen en la misma) y marca la primera aparición en una máscara por
+       fila mapeada en disco.
+    3. Relee el CSV y escribe las filas marcadas sin nulos en las mínimas.
+
+    La memoria pico es un bloque más una partición (16 bytes por fila entre
+    `n_partitions`), y el resultado coincide con `load_and_clean` (salvo
+    colisiones de hash, despreciables a 64 bits), igual que `clean_in_chunks`.
+
+    Args:
+        raw_path: Ruta al CSV crudo.
+        filename: Nombre del archivo de salida en data/processed.
+        chunksize: Filas por bloque.
+        n_partitions: Particiones de hashes en disco.
+        work_dir: Carpeta para los temporales (None = data/processed).
+    Returns:
+        (filas_escritas, ruta_archivo)
+    """
+    if not os.path.exists(raw_path):
+        raise FileNotFoundError(
+            f"No se encontró el archivo en {raw_path}. Coloca el dataset en data/raw/movie_theatre_sales.csv"
+        )
+    os.makedirs(PROCESSED_DIR, exist_ok=True)
+    path = os.path.join(PROCESSED_DIR, filename)
+    tmp_path = path + ".tmp"
+    spill = tempfile.mkdtemp(prefix="_dedupe-", dir=work_dir or PROCESSED_DIR)
+    try:
+        # 1) Hashes particionados en disco
+        part_paths = [os.path.join(spill, f"part-{i}.bin") for i in range(n_partitions)]
+        parts = [open(p, "wb") for p in part_paths]
+        try:
+            total = 0
+            for chunk in pd.read_csv(raw_path, chunksize=chunksize, dtype=STREAM_DTYPE):
+                pairs = np.empty(len(chunk), dtype=_HASH_ROW)
+                pairs["hash"] = _row_hashes(_normalize_block(chunk))
+                pairs["row"] = np.arange(total, total + len(chunk))
+                total += len(chunk)
+                bucket = pairs["hash"] % np.uint64(n_partitions)
+                order = np.argsort(bucket, kind="stable")
+                bounds = np.searchsorted(bucket[order], np.arange(n_partitions + 1))
+                for i in range(n_partitions):
+                    pairs[order[bounds[i]:bounds[i + 1]]].tofile(parts[i])
+        finally:
+            for f in parts:
+                f.close()
+
+        # 2) Primera aparición por partición → máscara de filas a conservar
+        keep = np.lib.format.open_memmap(os.path.join(spill, "keep.npy"), mode="w+", dtype=bool, shape=(total,))
+        keep[:] = False
+        for part_path in part_paths:
+            keep[_first_rows(part_path)] = True
+            os.remove(part_path)
+
+        # 3) Segunda lectura: se escriben solo las filas conservadas
+        written, offset = 0, 0
+        cube = None
+        header = True
+        with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+            for chunk in pd.read_csv(raw_path, chunksize=chunksize, dtype=STREAM_DTYPE):
+                mask = np.asarray(keep[offset:offset + len(chunk)])
+                offset += len(chunk)
+                chunk = _normalize_block(chunk)[mask].dropna(subset=["Age", "Ticket_Price", "Number_of_Person"])
+                chunk.to_csv(out, index=False, header=header)
+                header = False
+                written += len(chunk)
+                cube = update_rollup(cube, chunk)
+        del keep
+        os.replace(tmp_path, path)
+        if _is_cleaned_table(filename):
+            save_rollup(cube if cube is not None else build_rollup(pd.DataFrame(columns=essential_columns)), base_dir=PROCESSED_DIR)
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
+    return written, path
+
+
+def ingest_incremental(
+    raw_path: str = RAW_FILE_DEFAULT,
+    filename: str = "cleaned_data.csv",
+    key: Optional[str] = None,
+    final: bool = False,
+) -> Tuple[int, str]:
+    """Ingesta incremental (solo añadir) del CSV crudo.
+
+    Guarda en data/processed el desplazamiento en bytes ya procesado del CSV
+    crudo y un índice persistente de hashes de filas (o de `key`, p. ej.
+    "Ticket_ID"). Cada ejecución lee solo las líneas nuevas, las limpia,
+    descarta las ya ingeridas y las añade al archivo procesado (CSV o Parquet
+    según la extensión de `filename`) y, si es la tabla del dashboard
+    (`CLEANED_TABLE`), al cubo de agregados, así el costo depende de las filas
+    nuevas y no del histórico. Si el crudo se truncó o cambió su cabecera se
+    reconstruye desde cero.
+
+    Una última línea sin salto de línea puede estar a medio escribir: solo se
+    ingiere si el archivo no creció durante la lectura o con `final=True`. El
+    desplazamiento guardado se queda al inicio de esa línea, así en la
+    siguiente ejecución se relee y, si solo se completó con el salto, el
+    índice de hashes la descarta como ya ingerida.
+
+    Args:
+        raw_path: Ruta al CSV crudo (se asume que solo crece por el final).
+        filename: Archivo procesado de destino en data/processed.
+        key: Columna de deduplicación; None usa la fila completa.
+        final: Ingerir la última línea sin salto aunque el archivo esté creciendo.
+    Returns:
+        (filas_añadidas, ruta_archivo)
+    """
+    if not os.path.exists(raw_path):
+        raise FileNotFoundError(
+            f"No se encontró el archivo en {raw_path}. Coloca el dataset en data/raw/movie_theatre_sales.csv"
+        )
+    os.makedirs(PROCESSED_DIR, exist_ok=True)
+    path = os.path.join(PROCESSED_DIR, filename)
+    state_path = os.path.join(PROCESSED_DIR, INGEST_STATE_FILE)
+    index_path = os.path.join(PROCESSED_DIR, INGEST_INDEX_FILE)
+
+    with open(raw_path, "rb") as f:
+        header_line = f.readline()
+        size = os.fstat(f.fileno()).st_size
+
+        state = {}
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as sf:
+                state = json.load(sf)
+        valid = (
+            state.get("raw_path") == os.path.abspath(raw_path)
+            and state.get("filename") == filename
+            and state.get("key") == key
+            and state.get("header") == header_line.decode("utf-8")
+            and state.get("offset", 0) <= size
+            and os.path.exists(path)
+        )
+        if not valid:
+            # Primera ejecución o crudo reescrito: se reconstruye todo
+            state = {"offset": len(header_line), "rows": 0}
+            if os.path.exists(index_path):
+                os.remove(index_path)
+        seen = _HashIndex.load(index_path)
+
+        f.seek(state["offset"])
+        data = f.read()
+    # El desplazamiento avanza solo hasta la última línea completa; la cola sin
+    # salto se parsea si el archivo no está creciendo (ver docstring)
+    end = data.rfind(b"\n") + 1
+    settled = len(data) == size - state["offset"] and os.path.getsize(raw_path) == size
+    if not (final or settled):
+        data = data[:end]
+
+    columns = [c.strip() for c in header_line.decode("utf-8").strip().split(",")]
+    if data.strip():
+        delta = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=STREAM_DTYPE)
+        delta = _dedupe_block(delta, seen, key=key)
+    else:
+        delta = pd.DataFrame(columns=columns)
+
+    if filename.endswith(".parquet"):
+        name = filename[: -len(".parquet")]
+        if not valid:
+            save_table(delta, name, base_dir=PROCESSED_DIR)
+        elif len(delta):
+            append_table(delta, name, base_dir=PROCESSED_DIR)
+    elif not valid:
+        delta.to_csv(path, index=False)
+    elif len(delta):
+        delta.to_csv(path, mode="a", index=False, header=False)
+
+    # Cubo del tab de negocio (solo para la tabla del dashboard): se suma el lote nuevo
+    if _is_cleaned_table(filename):
+        if not valid:
+            save_rollup(build_rollup(delta), base_dir=PROCESSED_DIR)
+        elif len(delta):
+            save_rollup(update_rollup(load_rollup(base_dir=PROCESSED_DIR), delta), base_dir=PROCESSED_DIR)
+
+    # Índice y estado se reemplazan de forma atómica
+    seen.save(index_path)
+    state.update({
+        "raw_path": os.path.abspath(raw_path),
+        "filename": filename,
+        "key": key,
+        "header": header_line.decode("utf-8"),
+        "offset": state["offset"] + end,
+        "rows": state.get("rows", 0) + len(delta),
+    })
+    tmp_state = state_path + ".tmp"
+    with open(tmp_state, "w", encoding="utf-8") as sf:
+        json.dump(state, sf, indent=2)
+    os.replace(tmp_state, state_path)
+    return len(delta), path
+
+
+def save_processed(
+    df: pd.DataFrame,
+    filename: str = "cleaned_data.csv",
+    partition_cols: Optional[List[str]] = None,
+    backend: Optional[str] = None,
+) -> str:
+    """Guarda DataFrame procesado en data/processed y devuelve la ruta guardada.
+
+    Si `filename` termina en .parquet se usa el almacenamiento columnar
+    (`src.storage`), que conserva dtypes y admite `partition_cols`. Con
+    `backend="polars"` el CSV se escribe con el escritor multihilo de polars.
+    Si es la tabla del dashboard (`CLEANED_TABLE`) también reconstruye el
+    cubo de agregados, para que no quede desfasado.
+    """
+    if filename.endswith(".parquet"):
+        path = save_table(df, filename[: -len(".parquet")], partition_cols=partition_cols, base_dir=PROCESSED_DIR)
+    elif resolve_backend(backend) == "polars":
+        from . import polars_backend
+
+        path = polars_backend.save_csv(df, filename, base_dir=PROCESSED_DIR)
+    else:
+        os.makedirs(PROCESSED_DIR, exist_ok=True)
+        path = os.path.join(PROCESSED_DIR, filename)
+        df.to_csv(path, index=False)
+    if _is_cleaned_table(filename):
+        save_rollup(build_rollup(df), base_dir=PROCESSED_DIR)
     return path
 
 
-def load_and_clean(raw_path: str = RAW_FILE_DEFAULT) -> Tuple[pd.DataFrame, str]:
-    """Atajo: carga, limpia y guarda, devolviendo (df_limpio, ruta_archivo)."""
-    df = load_data(raw_path)
-    df_clean = basic_clean(df)
-    saved = save_processed(df_clean, "cleaned_data.csv")
+def _last_modified(path: str) -> int:
+    """mtime más reciente de un archivo o de cualquier archivo bajo un directorio."""
+    if not os.path.isdir(path):
+        return os.stat(path).st_mtime_ns
+    mtimes = [os.stat(os.path.join(root, f)).st_mtime_ns for root, _, files in os.walk(path) for f in files]
+    return max(mtimes, default=os.stat(path).st_mtime_ns)
+
+
+def latest_cleaned(base_dir: str = PROCESSED_DIR) -> Optional[str]:
+    """Ruta del artefacto de `CLEANED_TABLE` escrito más recientemente (.cols, .parquet o .csv).
+
+    Cada escritor actualiza un solo formato, así que elegir por formato podría
+    servir una copia desfasada; se elige por mtime (a igualdad gana el orden
+    .cols > .parquet > .csv). Devuelve None si no existe ninguno.
+    """
+    candidates = [os.path.join(base_dir, f"{CLEANED_TABLE}{ext}") for ext in (".cols", ".parquet", ".csv")]
+    existing = [p for p in candidates if os.path.exists(p)]
+    return max(existing, key=_last_modified) if existing else None
+
+
+def _clean_shard(path: str, typed: bool = False) -> pd.DataFrame:
+    return basic_clean(load_data(path, typed=typed))
+
+
+def clean_shards(sources: List[str], typed: bool = False, n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """Limpia cada shard con `basic_clean` en un pool de procesos y une sin duplicados.
+
+    La deduplicación global tras la unión da el mismo conjunto de filas que
+    limpiar el archivo concatenado, porque `basic_clean` solo quita
+    duplicados exactos y filas con nulos.
+
+    Args:
+        sources: Rutas de los shards (ver `resolve_sources`).
+        typed: Lector tipado por shard.
+        n_jobs: Procesos del pool (None = núcleos disponibles, 1 = en serie).
+    """
+    if n_jobs == 1 or len(sources) == 1:
+        parts = [_clean_shard(p, typed) for p in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as ex:
+            parts = list(ex.map(_clean_shard, sources, [typed] * len(sources)))
+    df = pd.concat(parts, ignore_index=True)
+    return df.drop_duplicates().reset_index(drop=True)
+
+
+def load_and_clean(
+    raw_path: str = RAW_FILE_DEFAULT,
+    fmt: str = "csv",
+    typed: bool = False,
+    n_jobs: Optional[int] = None,
+    compact: bool = False,
+    backend: Optional[str] = None,
+) -> Tuple[pd.DataFrame, str]:
+    """Atajo: carga, limpia y guarda, devolviendo (df_limpio, ruta_archivo).
+
+    `fmt="parquet"` guarda en formato columnar particionado por `Movie_Genre`
+    y `fmt="mmap"` como almacén de columnas mapeadas (`src.column_store`);
+    `typed=True` usa el lector con esquema declarado (ver `load_data`). Si
+    `raw_path` es un directorio o glob con varios shards, se limpian en
+    paralelo con `clean_shards` (`n_jobs` procesos). También guarda el cubo
+    de agregados del dashboard (`src.rollups`). `compact=True` aplica la
+    política de tipos compactos y registra el ahorro de memoria. Con
+    `backend="polars"` los shards se leen y deduplican juntos en polars.
+    """
+    sources = resolve_sources(raw_path)
+    backend = resolve_backend(backend)
+    if backend == "polars":
+        from . import polars_backend
+
+        df_clean = polars_backend.load_and_clean(raw_path, compact=compact)
+    elif len(sources) > 1:
+        df_clean = clean_shards(sources, typed=typed, n_jobs=n_jobs)
+        if compact:
+            df_clean = compact_dtypes(df_clean, stage="clean")
+    else:
+        df_clean = basic_clean(load_data(sources[0], typed=typed), compact=compact)
+    if fmt == "parquet":
+        saved = save_processed(df_clean, "cleaned_data.parquet", partition_cols=["Movie_Genre"])
+    elif fmt == "mmap":
+        saved = write_column_store(df_clean, CLEANED_TABLE, base_dir=PROCESSED_DIR)
+        save_rollup(build_rollup(df_clean), base_dir=PROCESSED_DIR)
+    else:
+        saved = save_processed(df_clean, "cleaned_data.csv", backend=backend)
     return df_clean, saved
@@ -0,0 +1,81 @@
+"""Política de tipos compactos (en español)
+
+Reduce la huella en memoria del pipeline: enteros pequeños para edad y
+tamaño de grupo, float32 para precios y gastos, category para las
+categóricas y uint8 para las dummies one-hot. Cada etapa registra la
+memoria antes y después en el logger del módulo.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import logging
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INTEGER_COLUMNS = ["Age", "Number_of_Person"]
+INT8_COLUMNS = ["Purchase_Again", "segment"]
+CATEGORICAL_COLUMNS = ["Movie_Genre", "Seat_Type", "age_group"]
+DUMMY_PREFIXES = ("Movie_Genre_", "Seat_Type_", "age_group_")
+
+
+def memory_mb(df: pd.DataFrame) -> float:
+    """Memoria del DataFrame en MB (incluye el contenido de columnas object)."""
+    return float(df.memory_usage(deep=True).sum() / 1024 ** 2)
+
+
+def _downcast_integer(s: pd.Series) -> pd.Series:
+    if s.notna().all() and (s % 1 == 0).all():
+        return pd.to_numeric(s.astype("int64"), downcast="integer")
+    return s.astype("float32")
+
+
+def compact_dtypes(df: pd.DataFrame, stage: str = "") -> pd.DataFrame:
+    """Devuelve `df` con tipos compactos y registra el ahorro de memoria.
+
+    - Age, Number_of_Person: el menor entero posible (float32 si hay nulos)
+    - Purchase_Again, segment: int8
+    - Resto de flotantes (precio, gastos): float32
+    - Movie_Genre, Seat_Type, age_group: category
+    - Dummies one-hot (bool o "True"/"False" tras CSV): uint8
+
+    Args:
+        df: DataFrame de cualquier etapa (limpio o features).
+        stage: Nombre de la etapa para el registro.
+    """
+    before = memory_mb(df)
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in INTEGER_COLUMNS and pd.api.types.is_numeric_dtype(s):
+            s = _downcast_integer(s)
+        elif c in INT8_COLUMNS and pd.api.types.is_numeric_dtype(s) and s.notna().all():
+            s = s.astype("int8")
+        elif c in CATEGORICAL_COLUMNS:
+            s = s.astype("category")
+        elif c.startswith(DUMMY_PREFIXES):
+            if s.dtype == object:
+                s = s.astype(str).str.lower().isin(["true", "1"])
+            s = s.astype(np.uint8)
+        elif pd.api.types.is_float_dtype(s):
+            s = s.astype("float32")
+        out[c] = s
+    result = pd.DataFrame(out, index=df.index)
+    report = memory_savings(before, memory_mb(result))
+    logger.info(
+        "Etapa %s: %.2f MB → %.2f MB (ahorro %.2f MB, %.0f%%)",
+        stage or "-", report["before_mb"], report["after_mb"], report["saved_mb"], report["saved_pct"],
+    )
+    return result
+
+
+def memory_savings(before_mb: float, after_mb: float) -> Dict[str, float]:
+    """Resumen de ahorro de memoria entre dos mediciones en MB."""
+    saved = before_mb - after_mb
+    return {
+        "before_mb": before_mb,
+        "after_mb": after_mb,
+        "saved_mb": saved,
+        "saved_pct": (saved / before_mb * 100.0) if before_mb > 0 else 0.0,
+    }
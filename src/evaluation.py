@@ -0,0 +1,307 @@
+"""Evaluación robusta de los modelos de clasificación (en español)
+
+`evaluate_classification` da un único punto sobre un split 80/20. Aquí:
+- `cross_validate_models`: k-fold estratificado de retención y propensión,
+  con todos los pares (modelo, fold) repartidos entre núcleos.
+- `bootstrap_report`: intervalos de confianza bootstrap de cada campo de
+  `ClassificationReport`, remuestreando todas las réplicas a la vez.
+- `sliced_report`: matriz de confusión y AUC por segmento, género, asiento y
+  grupo de edad, en una pasada agrupada sobre el arreglo de predicciones.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import dataclasses
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from .feature_engineering import AGE_BINS, AGE_LABELS
+from .modeling import ClassificationReport, _numeric_inputs, _split_xy, evaluate_classification
+
+CV_MODELS = ("retention", "propensity")
+REPORT_FIELDS = [f.name for f in dataclasses.fields(ClassificationReport)]
+# Niveles de probabilidad distintos a partir de los cuales el bootstrap agrupa en cuantiles
+BOOTSTRAP_MAX_LEVELS = 2048
+# Cortes de `sliced_report`; age_group se deriva de Age si no viene en los datos
+SLICE_COLUMNS = ("segment", "Movie_Genre", "Seat_Type", "age_group")
+
+
+def _make_pipeline(name: str, numeric_cols: List[str]) -> Pipeline:
+    # Mismos modelos que train_retention_model / train_propensity_model; el bosque
+    # usa un hilo porque el paralelismo ya está en los folds
+    if name == "retention":
+        clf = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=1)
+    elif name == "propensity":
+        clf = LogisticRegression(max_iter=1000)
+    else:
+        raise ValueError(f"Modelo desconocido {name!r}; opciones: {CV_MODELS}")
+    pre = ColumnTransformer([("num", StandardScaler(), numeric_cols)], remainder="drop")
+    return Pipeline([("prep", pre), ("clf", clf)])
+
+
+def _fit_fold(
+    name: str, fold: int, X: pd.DataFrame, y: pd.Series, idx_tr: np.ndarray, idx_te: np.ndarray
+) -> Dict[str, float]:
+    start = time.perf_counter()
+    pipe = _make_pipeline(name, _numeric_inputs(X))
+    pipe.fit(X.iloc[idx_tr], y.iloc[idx_tr])
+    X_te, y_te = X.iloc[idx_te], y.iloc[idx_te]
+    report = evaluate_classification(y_te, pipe.predict(X_te), pipe.predict_proba(X_te)[:, 1])
+    return {"model": name, "fold": fold, **dataclasses.asdict(report), "seconds": time.perf_counter() - start}
+
+
+def cross_validate_models(
+    df_feat: pd.DataFrame,
+    target: str = "Purchase_Again",
+    models: Sequence[str] = CV_MODELS,
+    n_splits: int = 5,
+    n_jobs: int = -1,
+) -> pd.DataFrame:
+    """K-fold estratificado de los modelos de clasificación, en paralelo.
+
+    Todos los modelos usan los mismos folds (`random_state=42`) y cada par
+    (modelo, fold) es una tarea independiente del pool de joblib.
+
+    Args:
+        df_feat: Features con la columna objetivo.
+        target: Columna objetivo.
+        models: Subconjunto de `CV_MODELS`.
+        n_splits: Número de folds.
+        n_jobs: Procesos (-1 = todos los núcleos).
+    Returns:
+        Una fila por (modelo, fold) con los campos de `ClassificationReport`
+        y los segundos de ajuste; resumir con `summarize_folds`.
+    """
+    X, y = _split_xy(df_feat, target)
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y))
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(name, i, X, y, idx_tr, idx_te)
+        for name in models
+        for i, (idx_tr, idx_te) in enumerate(folds)
+    )
+    return pd.DataFrame(rows)
+
+
+def summarize_folds(folds: pd.DataFrame) -> pd.DataFrame:
+    """Media y desviación estándar de cada métrica por modelo."""
+    return folds.groupby("model")[REPORT_FIELDS].agg(["mean", "std"])
+
+
+def _score_cells(y_true: np.ndarray, y_prob: np.ndarray, threshold: float) -> Tuple[np.ndarray, int]:
+    """Cuenta filas por (nivel de probabilidad, clase) y da el primer nivel predicho positivo."""
+    levels, level = np.unique(y_prob, return_inverse=True)
+    counts = np.bincount(level * 2 + y_true, minlength=2 * len(levels))
+    return counts.reshape(len(levels), 2), int(np.searchsorted(levels, threshold, side="right"))
+
+
+def _coarsen_cells(cells: np.ndarray, first_positive: int, max_levels: int) -> Tuple[np.ndarray, int]:
+    """Agrupa niveles contiguos en `max_levels` cuantiles con un corte en el umbral.
+
+    La matriz de confusión sigue siendo exacta; la AUC solo cambia por los
+    pares que caen en un mismo grupo (cuentan como empate).
+    """
+    if len(cells) <= max_levels:
+        return cells, first_positive
+    cum = np.cumsum(cells.sum(axis=1))
+    targets = cum[-1] * np.linspace(0, 1, max_levels + 1)[1:-1]
+    starts = np.unique(np.concatenate([[0, first_positive], np.searchsorted(cum, targets, side="right")]))
+    starts = starts[starts < len(cells)]
+    return np.add.reduceat(cells, starts, axis=0), int(np.searchsorted(starts, first_positive))
+
+
+def _metrics_from_cells(cells: np.ndarray, first_positive: int) -> Dict[str, np.ndarray]:
+    """Campos de `ClassificationReport` para un lote de tablas (réplicas, niveles, clase)."""
+    neg, pos = cells[..., 0].astype("float64"), cells[..., 1].astype("float64")
+    n_pos, n_neg = pos.sum(axis=-1), neg.sum(axis=-1)
+    tp, fp = pos[..., first_positive:].sum(axis=-1), neg[..., first_positive:].sum(axis=-1)
+    fn, tn = n_pos - tp, n_neg - fp
+    # AUC de Mann-Whitney: cada positivo gana a los negativos de niveles menores y empata con los del suyo
+    neg_below = np.cumsum(neg, axis=-1) - neg
+    wins = (pos * (neg_below + 0.5 * neg)).sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "accuracy": (tp + tn) / (n_pos + n_neg),
+            "precision": np.where(tp + fp > 0, tp / (tp + fp), 0.0),
+            "recall": np.where(n_pos > 0, tp / n_pos, 0.0),
+            "f1": np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0),
+            "roc_auc": np.where(n_pos * n_neg > 0, wins / (n_pos * n_neg), np.nan),
+        }
+
+
+def bootstrap_report(
+    y_true,
+    y_prob,
+    threshold: float = 0.5,
+    n_resamples: int = 1000,
+    confidence: float = 0.95,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """Intervalos de confianza bootstrap (percentil) de cada campo de `ClassificationReport`.
+
+    Todas las métricas dependen solo de cuántas filas de cada clase hay en
+    cada nivel de probabilidad, así que remuestrear filas con reemplazo
+    equivale a una multinomial sobre esas celdas: las `n_resamples` réplicas
+    se generan en una sola llamada y las métricas se calculan sobre la matriz
+    (réplicas × niveles), sin bucle por réplica. Con más de
+    `BOOTSTRAP_MAX_LEVELS` probabilidades distintas, las réplicas usan
+    niveles agrupados por cuantiles (ver `_coarsen_cells`). La clase predicha es
+    `y_prob > threshold`, como `predict` de los modelos.
+
+    Args:
+        y_true: Etiquetas 0/1 del test.
+        y_prob: Probabilidades de la clase positiva.
+        threshold: Umbral de decisión.
+        n_resamples: Réplicas bootstrap.
+        confidence: Nivel del intervalo.
+        random_state: Semilla.
+    Returns:
+        Una fila por métrica: estimate (sobre los datos originales), ci_low,
+        ci_high y std de las réplicas.
+    """
+    y_true = np.asarray(y_true).astype("int64")
+    y_prob = np.asarray(y_prob, dtype="float64")
+    cells, first_positive = _score_cells(y_true, y_prob, threshold)
+    point = _metrics_from_cells(cells, first_positive)
+    cells, first_positive = _coarsen_cells(cells, first_positive, BOOTSTRAP_MAX_LEVELS)
+    rng = np.random.default_rng(random_state)
+    resampled = rng.multinomial(len(y_true), cells.ravel() / len(y_true), size=n_resamples)
+    replicas = _metrics_from_cells(resampled.reshape(n_resamples, *cells.shape), first_positive)
+
+    tail = (1 - confidence) / 2
+    rows = []
+    for name in REPORT_FIELDS:
+        values = replicas[name]
+        low, high = np.nanquantile(values, [tail, 1 - tail]) if np.isfinite(values).any() else (np.nan, np.nan)
+        rows.append({
+            "metric": name,
+            "estimate": float(point[name]),
+            "ci_low": float(low),
+            "ci_high": float(high),
+            "std": float(np.nanstd(values)) if np.isfinite(values).any() else float("nan"),
+        })
+    return pd.DataFrame(rows)
+
+
+def _slice_codes(frame: pd.DataFrame, column: str) -> Tuple[np.ndarray, pd.Index]:
+    if column == "age_group" and column not in frame.columns:
+        values = pd.cut(frame["Age"], bins=AGE_BINS, labels=AGE_LABELS, include_lowest=True)
+    else:
+        values = frame[column]
+    codes, labels = pd.factorize(values, sort=True)  # nulos → -1
+    return codes.astype("int64"), pd.Index(labels)
+
+
+def _grouped_counts(
+    codes: np.ndarray, n_groups: int, y_true: np.ndarray, y_prob: np.ndarray, y_pred: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Matriz de confusión y AUC de cada grupo, sin separar los datos por grupo.
+
+    Recibe las filas ya ordenadas por probabilidad. Las cuatro celdas salen de
+    un `bincount` sobre (grupo, clase, predicción). Para la AUC basta un
+    reordenamiento estable por grupo (radix sobre códigos enteros pequeños),
+    que conserva el orden por probabilidad dentro de cada grupo: el rango
+    promedio de cada fila en su grupo, con empates, da la suma de rangos de
+    los positivos y de ahí el estadístico de Mann-Whitney.
+    """
+    cells = np.bincount(codes * 4 + y_true * 2 + y_pred, minlength=4 * n_groups).reshape(n_groups, 4)
+    tn, fp, fn, tp = (cells[:, i].astype("float64") for i in range(4))
+    sizes = cells.sum(axis=1)
+
+    small = np.int16 if n_groups < 2 ** 15 else np.int64
+    order = np.argsort(codes.astype(small), kind="stable")
+    g = np.repeat(np.arange(n_groups), sizes)
+    prob = y_prob[order]
+    new_run = np.ones(len(g), dtype=bool)
+    new_run[1:] = (g[1:] != g[:-1]) | (prob[1:] != prob[:-1])
+    run_start = np.flatnonzero(new_run)
+    run_end = np.append(run_start[1:], len(g)) - 1
+    run = np.cumsum(new_run) - 1
+    group_start = np.cumsum(sizes) - sizes
+    rank = (run_start[run] + run_end[run]) / 2 - group_start[g] + 1
+    rank_sum = np.bincount(g, weights=rank * y_true[order], minlength=n_groups)
+
+    n_pos, n_neg = tp + fn, tn + fp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = np.where(n_pos * n_neg > 0, (rank_sum - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg), np.nan)
+    return {"tp": tp, "fp": fp, "fn": fn, "tn": tn, "roc_auc": auc}
+
+
+def sliced_report(
+    frame: pd.DataFrame,
+    y_true,
+    y_prob,
+    by: Optional[Sequence[str]] = None,
+    threshold: float = 0.5,
+) -> pd.DataFrame:
+    """Métricas de clasificación por corte (segmento, género, asiento, edad...).
+
+    Las probabilidades se ordenan una sola vez; cada columna de `by` se
+    factoriza a códigos enteros y todas sus categorías se evalúan juntas
+    (`_grouped_counts`), sin copiar filas a DataFrames por grupo ni llamar a
+    `evaluate_classification` por categoría. Las filas con el corte nulo no
+    cuentan en ese corte. La clase predicha es `y_prob > threshold`.
+
+    Args:
+        frame: Datos alineados con las predicciones (p. ej. el test limpio,
+            con una columna `segment` si se quiere ese corte).
+        y_true: Etiquetas 0/1.
+        y_prob: Probabilidades de la clase positiva.
+        by: Columnas de corte; por defecto las de `SLICE_COLUMNS` presentes
+            (age_group se deriva de Age).
+        threshold: Umbral de decisión.
+    Returns:
+        Tabla ordenada con una fila por (slice, value), más la fila
+        ("all", "all"): n, positives, tp, fp, fn, tn y los campos de
+        `ClassificationReport`.
+
+    Raises:
+        KeyError: si una columna pedida en `by` no está en `frame`.
+    """
+    if by is None:
+        by = [c for c in SLICE_COLUMNS if c in frame.columns or (c == "age_group" and "Age" in frame.columns)]
+    # Todo el trabajo posterior ocurre en el orden por probabilidad
+    y_prob = np.asarray(y_prob, dtype="float64")
+    by_prob = np.argsort(y_prob)
+    y_prob = y_prob[by_prob]
+    y_true = np.asarray(y_true).astype("int64")[by_prob]
+    y_pred = (y_prob > threshold).astype("int64")
+
+    slices = [("all", np.zeros(len(y_true), dtype="int64"), pd.Index(["all"]))]
+    for column in by:
+        if column not in frame.columns and not (column == "age_group" and "Age" in frame.columns):
+            raise KeyError(f"La columna de corte {column!r} no está en los datos")
+        slices.append((column, *_slice_codes(frame, column)))
+
+    tables = []
+    for column, codes, labels in slices:
+        # Los nulos (-1) van a un grupo extra que se descarta
+        codes = codes[by_prob]
+        codes[codes < 0] = len(labels)
+        counts = _grouped_counts(codes, len(labels) + 1, y_true, y_prob, y_pred)
+        tp, fp, fn, tn = (counts[k][:-1] for k in ("tp", "fp", "fn", "tn"))
+        n = tp + fp + fn + tn
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tables.append(pd.DataFrame({
+                "slice": column,
+                "value": labels.astype(str),
+                "n": n.astype("int64"),
+                "positives": (tp + fn).astype("int64"),
+                "tp": tp.astype("int64"),
+                "fp": fp.astype("int64"),
+                "fn": fn.astype("int64"),
+                "tn": tn.astype("int64"),
+                "accuracy": (tp + tn) / n,
+                "precision": np.where(tp + fp > 0, tp / (tp + fp), 0.0),
+                "recall": np.where(tp + fn > 0, tp / (tp + fn), 0.0),
+                "f1": np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0),
+                "roc_auc": counts["roc_auc"][:-1],
+            }))
+    return pd.concat(tables, ignore_index=True)
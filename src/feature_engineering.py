@@ -5,45 +5,292 @@ Autor: CMSR92
 """
 from __future__ import annotations
 import os
-from typing import Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from .backends import resolve_backend
+from .dtypes import compact_dtypes
+from .storage import save_table
 
 PROCESSED_DIR = os.path.join("data", "processed")
+AGE_BINS = [0, 17, 24, 39, 59, 120]
+AGE_LABELS = ["<18", "18-24", "25-39", "40-59", "60+"]
+BASE_NUMERIC = ["Age", "Ticket_Price", "Number_of_Person"]
+DERIVED_NUMERIC = ["gasto_total_est", "gasto_promedio"]
+ONE_HOT_COLUMNS = ["Movie_Genre", "Seat_Type"]
+TRANSFORMER_FILE = "feature_transformer.joblib"
+SPARSE_ENCODINGS = ("hashing", "vocabulary")
 
 
-def create_features(df: pd.DataFrame) -> pd.DataFrame:
+def create_features(df: pd.DataFrame, compact: bool = False, backend: Optional[str] = None) -> pd.DataFrame:
     """Crea variables derivadas básicas.
 
     - gasto_total_est (Ticket_Price * Number_of_Person)
     - gasto_promedio (igual al precio cuando no hay historial)
     - age_group (bins)
-    - one-hot para Movie_Genre y Seat_Type
+    - one-hot para Movie_Genre y Seat_Type (uint8 con `compact=True`)
+
+    `backend="polars"` ejecuta lo mismo con polars (ver `src.backends`).
     """
+    if resolve_backend(backend) == "polars":
+        from . import polars_backend
+
+        return polars_backend.create_features(df, compact=compact)
     df = df.copy()
 
     df["gasto_total_est"] = df["Ticket_Price"].fillna(0) * df["Number_of_Person"].fillna(1)
     df["gasto_promedio"] = df["Ticket_Price"].fillna(df["Ticket_Price"].median())
 
     # Agrupación de edades
-    bins = [0, 17, 24, 39, 59, 120]
-    labels = ["<18", "18-24", "25-39", "40-59", "60+"]
-    df["age_group"] = pd.cut(df["Age"], bins=bins, labels=labels, include_lowest=True)
+    df["age_group"] = pd.cut(df["Age"], bins=AGE_BINS, labels=AGE_LABELS, include_lowest=True)
 
     # One-hot
-    df = pd.get_dummies(df, columns=["Movie_Genre", "Seat_Type", "age_group"], drop_first=True)
+    df = pd.get_dummies(
+        df, columns=["Movie_Genre", "Seat_Type", "age_group"], drop_first=True, dtype=np.uint8 if compact else bool
+    )
 
+    if compact:
+        df = compact_dtypes(df, stage="features")
     return df
 
 
-def save_features(df: pd.DataFrame, filename: str = "model_features.csv") -> str:
+class FeatureTransformer:
+    """Features con esquema congelado: `fit` una vez, `transform` por lotes.
+
+    `fit` fija los vocabularios de Movie_Genre/Seat_Type, los bins de edad y
+    las medianas de relleno; `transform_matrix` escribe cualquier lote (o
+    chunk) en una matriz numérica con columnas `feature_names_`, siempre en el
+    mismo orden, sin `get_dummies` ni realineación. Igual que
+    `create_features(drop_first=True)`, la primera categoría de cada
+    vocabulario es la base; las categorías no vistas en `fit` también quedan
+    en cero. Es un objeto simple de joblib: se guarda junto a los modelos con
+    `modeling.save_model(transformer, TRANSFORMER_FILE)`.
+    """
+
+    def __init__(self) -> None:
+        self.vocabularies_: Dict[str, List[str]] = {}
+        self.medians_: Dict[str, float] = {}
+        self.age_bins_: List[float] = list(AGE_BINS)
+        self.age_labels_: List[str] = list(AGE_LABELS)
+        self.feature_names_: List[str] = []
+
+    @property
+    def n_features_(self) -> int:
+        return len(self.feature_names_)
+
+    def fit(self, df: pd.DataFrame) -> "FeatureTransformer":
+        """Aprende vocabularios (ordenados) y medianas a partir de datos limpios."""
+        for col in ONE_HOT_COLUMNS:
+            self.vocabularies_[col] = sorted(df[col].dropna().astype(str).unique().tolist())
+        for col in BASE_NUMERIC:
+            median = df[col].astype("float64").median()
+            self.medians_[col] = float(median) if pd.notna(median) else 0.0
+
+        names = BASE_NUMERIC + DERIVED_NUMERIC
+        for col in ONE_HOT_COLUMNS:
+            names += [f"{col}_{v}" for v in self.vocabularies_[col][1:]]
+        names += [f"age_group_{label}" for label in self.age_labels_[1:]]
+        self.feature_names_ = names
+        return self
+
+    def _check_fitted(self) -> None:
+        if not self.feature_names_:
+            raise RuntimeError("FeatureTransformer no está ajustado: llama a fit() primero")
+
+    @staticmethod
+    def _one_hot(codes: np.ndarray, out: np.ndarray, offset: int) -> None:
+        # Código 0 = categoría base y -1 = nula o no vista: ambas quedan en cero
+        rows = np.flatnonzero(codes > 0)
+        out[rows, offset + codes[rows] - 1] = 1
+
+    def transform_matrix(
+        self, df: pd.DataFrame, out: Optional[np.ndarray] = None, dtype=np.float64
+    ) -> np.ndarray:
+        """Escribe las features de `df` en una matriz (filas de `df` × `feature_names_`).
+
+        Args:
+            df: Lote de datos limpios (no requiere todas las categorías).
+            out: Matriz preasignada con al menos `len(df)` filas y `n_features_`
+                columnas; se reutiliza entre chunks y se devuelve la vista
+                `out[:len(df)]`. Si es None se crea una de `dtype`.
+            dtype: Tipo de la matriz nueva cuando `out` es None.
+        Raises:
+            RuntimeError: si el transformador no está ajustado.
+            ValueError: si `out` no tiene la forma necesaria.
+        """
+        self._check_fitted()
+        n = len(df)
+        if out is None:
+            out = np.empty((n, self.n_features_), dtype=dtype)
+        elif out.ndim != 2 or out.shape[0] < n or out.shape[1] != self.n_features_:
+            raise ValueError(
+                f"`out` debe tener forma (>= {n}, {self.n_features_}); recibido {out.shape}"
+            )
+        X = out[:n]
+
+        for j, col in enumerate(BASE_NUMERIC):
+            X[:, j] = df[col].astype("float64").fillna(self.medians_[col]).to_numpy()
+        price = df["Ticket_Price"].astype("float64")
+        group = df["Number_of_Person"].astype("float64")
+        j = len(BASE_NUMERIC)
+        X[:, j] = (price.fillna(0) * group.fillna(1)).to_numpy()
+        X[:, j + 1] = X[:, 1]
+
+        offset = len(BASE_NUMERIC) + len(DERIVED_NUMERIC)
+        X[:, offset:] = 0
+        for col in ONE_HOT_COLUMNS:
+            vocab = self.vocabularies_[col]
+            codes = pd.Categorical(df[col].astype("string"), categories=vocab).codes.astype(np.int64)
+            self._one_hot(codes, X, offset)
+            offset += len(vocab) - 1
+        ages = pd.cut(df["Age"], bins=self.age_bins_, labels=self.age_labels_, include_lowest=True)
+        self._one_hot(ages.cat.codes.to_numpy().astype(np.int64), X, offset)
+        return X
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Como `transform_matrix`, pero como DataFrame con el índice de `df`."""
+        return pd.DataFrame(self.transform_matrix(df), index=df.index, columns=self.feature_names_)
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
+
+class SparseEncoder(BaseEstimator, TransformerMixin):
+    """Codificación dispersa (CSR) para categóricas de alta cardinalidad.
+
+    Cada fila tiene las numéricas estandarizadas más un 1 por categórica, de
+    modo que memoria y tiempo de ajuste crecen con los no-ceros y no con el
+    número de niveles (título, sala, franja, código promocional...). Es un
+    transformador de sklearn: va como paso "prep" de un Pipeline.
+
+    Args:
+        categorical: Columnas categóricas a codificar.
+        numeric: Columnas numéricas (se rellenan con la mediana y se estandarizan).
+        encoding: "hashing" (truco de hashing a `n_buckets` columnas, sin
+            vocabulario que guardar) o "vocabulary" (una columna por nivel
+            visto en `fit` con al menos `min_count` apariciones; los demás se
+            ignoran).
+        n_buckets: Columnas del espacio hasheado.
+        min_count: Frecuencia mínima de un nivel en modo vocabulario.
+    """
+
+    def __init__(
+        self,
+        categorical: Sequence[str] = tuple(ONE_HOT_COLUMNS),
+        numeric: Sequence[str] = tuple(BASE_NUMERIC),
+        encoding: str = "hashing",
+        n_buckets: int = 2 ** 18,
+        min_count: int = 1,
+    ) -> None:
+        self.categorical = categorical
+        self.numeric = numeric
+        self.encoding = encoding
+        self.n_buckets = n_buckets
+        self.min_count = min_count
+
+    def fit(self, X: pd.DataFrame, y=None) -> "SparseEncoder":
+        if self.encoding not in SPARSE_ENCODINGS:
+            raise ValueError(f"encoding debe ser uno de {SPARSE_ENCODINGS}; recibido {self.encoding!r}")
+        num = X[list(self.numeric)].astype("float64")
+        self.medians_ = num.median().fillna(0.0).to_numpy()
+        num = num.fillna(pd.Series(self.medians_, index=num.columns))
+        self.means_ = num.mean().to_numpy()
+        std = num.std(ddof=0).to_numpy()
+        self.scales_ = np.where(std > 0, std, 1.0)
+
+        self.vocabularies_: Dict[str, pd.Index] = {}
+        self.offsets_: List[int] = []
+        offset = len(self.numeric)
+        for col in self.categorical:
+            self.offsets_.append(offset)
+            if self.encoding == "vocabulary":
+                counts = X[col].dropna().astype(str).value_counts()
+                vocab = pd.Index(sorted(counts.index[counts >= self.min_count]))
+                self.vocabularies_[col] = vocab
+                offset += len(vocab)
+        self.n_features_out_ = offset if self.encoding == "vocabulary" else len(self.numeric) + self.n_buckets
+        return self
+
+    def _category_columns(self, col: str, i: int, values: pd.Series) -> np.ndarray:
+        # Índice de columna por fila (-1 = nulo o nivel no visto); se calcula sobre los niveles únicos
+        codes, uniques = pd.factorize(values.astype("string"), use_na_sentinel=True)
+        if self.encoding == "vocabulary":
+            positions = self.vocabularies_[col].get_indexer(uniques.astype(str))
+            mapped = np.where(positions >= 0, positions + self.offsets_[i], -1)
+        else:
+            tokens = np.asarray([f"{col}={u}" for u in uniques], dtype=object)
+            hashes = pd.util.hash_array(tokens) if len(tokens) else np.empty(0, dtype=np.uint64)
+            mapped = (hashes % np.uint64(self.n_buckets)).astype(np.int64) + len(self.numeric)
+        return np.where(codes >= 0, mapped[codes] if len(mapped) else -1, -1)
+
+    def transform(self, X: pd.DataFrame) -> sp.csr_matrix:
+        """Devuelve la matriz CSR (filas de `X` × `n_features_out_`) sin pasar por denso."""
+        n = len(X)
+        num = X[list(self.numeric)].astype("float64").to_numpy()
+        num = np.where(np.isnan(num), self.medians_, num)
+        num = (num - self.means_) / self.scales_
+
+        rows = [np.repeat(np.arange(n), len(self.numeric))]
+        cols = [np.tile(np.arange(len(self.numeric)), n)]
+        data = [num.ravel()]
+        for i, col in enumerate(self.categorical):
+            idx = self._category_columns(col, i, X[col])
+            keep = np.flatnonzero(idx >= 0)
+            rows.append(keep)
+            cols.append(idx[keep])
+            data.append(np.ones(len(keep)))
+        out = sp.coo_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n, self.n_features_out_),
+        )
+        return out.tocsr()
+
+
+class CategoricalFrame(BaseEstimator, TransformerMixin):
+    """Selecciona numéricas + categóricas y deja estas como `category` (sin one-hot).
+
+    Para modelos con soporte nativo de categóricas (LightGBM): las categorías
+    se fijan en `fit`, así los códigos coinciden entre entrenamiento y scoring.
+    """
+
+    def __init__(self, categorical: Sequence[str] = tuple(ONE_HOT_COLUMNS)) -> None:
+        self.categorical = categorical
+
+    def fit(self, X: pd.DataFrame, y=None) -> "CategoricalFrame":
+        self.categorical_ = [c for c in self.categorical if c in X.columns]
+        self.numeric_ = [c for c in X.select_dtypes(include="number").columns if c not in self.categorical_]
+        self.dtypes_ = {
+            c: pd.CategoricalDtype(sorted(X[c].dropna().astype(str).unique())) for c in self.categorical_
+        }
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        out = X[self.numeric_ + self.categorical_].copy()
+        for c, dtype in self.dtypes_.items():
+            out[c] = out[c].astype(str).astype(dtype)
+        return out
+
+
+def save_features(df: pd.DataFrame, filename: str = "model_features.csv", backend: Optional[str] = None) -> str:
+    if filename.endswith(".parquet"):
+        return save_table(df, filename[: -len(".parquet")], base_dir=PROCESSED_DIR)
+    if resolve_backend(backend) == "polars":
+        from . import polars_backend
+
+        return polars_backend.save_csv(df, filename, base_dir=PROCESSED_DIR)
     os.makedirs(PROCESSED_DIR, exist_ok=True)
     path = os.path.join(PROCESSED_DIR, filename)
     df.to_csv(path, index=False)
     return path
 
 
-def build_features_pipeline(df_clean: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
-    """Atajo: crea y guarda features."""
-    feat = create_features(df_clean)
-    saved = save_features(feat)
+def build_features_pipeline(
+    df_clean: pd.DataFrame, fmt: str = "csv", compact: bool = False, backend: Optional[str] = None
+) -> Tuple[pd.DataFrame, str]:
+    """Atajo: crea y guarda features (`fmt="parquet"` para formato columnar)."""
+    feat = create_features(df_clean, compact=compact, backend=backend)
+    saved = save_features(feat, "model_features.parquet" if fmt == "parquet" else "model_features.csv", backend=backend)
     return feat, saved
@@ -0,0 +1,156 @@
+"""Almacén versionado de features (en español)
+
+Materializa `create_features` una sola vez por versión, indexada por la
+huella de los datos limpios y la versión del código de features, como
+almacén de columnas .npy (ver `src.column_store`). Se conservan las
+`MAX_VERSIONS` versiones usadas más recientemente; entrenamiento,
+segmentación y dashboard abren la misma matriz mapeada en memoria en lugar
+de recalcularla o releer un CSV.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+from typing import Optional, Sequence, Tuple
+import pandas as pd
+
+from . import dtypes, feature_engineering
+from .cache import code_version
+from .column_store import META_FILE, open_column_store, store_path, write_column_store
+
+FEATURE_STORE_DIR = os.path.join("data", "features")
+MAX_VERSIONS = 4
+LATEST_FILE = "LATEST"
+STORE_SUFFIX = ".cols"
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Huella del contenido de un DataFrame (nombres de columnas + valores).
+
+    Las numéricas se comparan como float64 y las categóricas por su valor, así
+    la huella no cambia si el mismo dato limpio llega con enteros compactos,
+    desde CSV o desde el almacén mapeado.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_numeric_dtype(s):
+            s = s.astype("float64")
+        h.update(str(col).encode())
+        h.update(pd.util.hash_pandas_object(s, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def feature_version(compact: bool = False) -> str:
+    """Versión del código de features (cambia al editar feature_engineering o dtypes)."""
+    version = code_version(feature_engineering, dtypes)
+    return f"{version}-compact" if compact else version
+
+
+def version_key(df_clean: pd.DataFrame, compact: bool = False) -> str:
+    """Clave de una versión: huella de los datos limpios + versión del código."""
+    return f"{frame_fingerprint(df_clean)}-{feature_version(compact)}"
+
+
+def _versions(base_dir: str):
+    if not os.path.isdir(base_dir):
+        return []
+    return [name[: -len(STORE_SUFFIX)] for name in os.listdir(base_dir) if name.endswith(STORE_SUFFIX)]
+
+
+def _set_latest(key: str, base_dir: str) -> None:
+    tmp_path = os.path.join(base_dir, LATEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(key)
+    os.replace(tmp_path, os.path.join(base_dir, LATEST_FILE))
+
+
+def latest_version(base_dir: str = FEATURE_STORE_DIR) -> Optional[str]:
+    """Última versión servida por `get_features`, o None si el almacén está vacío."""
+    path = os.path.join(base_dir, LATEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        key = f.read().strip()
+    return key if os.path.isdir(store_path(key, base_dir)) else None
+
+
+def evict(base_dir: str = FEATURE_STORE_DIR, max_versions: int = MAX_VERSIONS, keep: Optional[str] = None) -> int:
+    """Borra las versiones usadas hace más tiempo hasta dejar `max_versions`. Devuelve cuántas borró.
+
+    Los procesos que ya tienen abierta una versión borrada conservan sus mapas.
+    """
+    by_use = sorted(
+        _versions(base_dir),
+        key=lambda k: os.stat(store_path(k, base_dir)).st_mtime_ns,
+        reverse=True,
+    )
+    stale = [k for k in by_use[max_versions:] if k != keep]
+    for key in stale:
+        shutil.rmtree(store_path(key, base_dir), ignore_errors=True)
+    return len(stale)
+
+
+def get_features(
+    df_clean: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    compact: bool = False,
+    base_dir: str = FEATURE_STORE_DIR,
+    max_versions: int = MAX_VERSIONS,
+) -> Tuple[pd.DataFrame, str]:
+    """Devuelve (features, versión) para `df_clean`, materializándolas solo si faltan.
+
+    Args:
+        df_clean: Datos limpios (salida de `load_and_clean`).
+        columns: Columnas a abrir (None = todas).
+        compact: Usa `create_features(compact=True)` (versión aparte).
+        base_dir: Carpeta del almacén.
+        max_versions: Versiones a conservar tras materializar una nueva.
+    """
+    key = version_key(df_clean, compact=compact)
+    path = store_path(key, base_dir)
+    if os.path.isdir(path):
+        os.utime(path)  # orden LRU para `evict`
+    else:
+        os.makedirs(base_dir, exist_ok=True)
+        write_column_store(feature_engineering.create_features(df_clean, compact=compact), key, base_dir=base_dir)
+        evict(base_dir, max_versions, keep=key)
+    _set_latest(key, base_dir)
+    return open_column_store(key, columns=columns, base_dir=base_dir), key
+
+
+def open_version(
+    key: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    base_dir: str = FEATURE_STORE_DIR,
+) -> pd.DataFrame:
+    """Abre una versión guardada (la última servida si `key` es None).
+
+    Raises:
+        FileNotFoundError: si la versión no existe o el almacén está vacío.
+    """
+    key = key or latest_version(base_dir)
+    if key is None:
+        raise FileNotFoundError(f"No hay versiones de features en {base_dir}")
+    return open_column_store(key, columns=columns, base_dir=base_dir)
+
+
+def list_versions(base_dir: str = FEATURE_STORE_DIR) -> pd.DataFrame:
+    """Versiones guardadas (más reciente primero) con filas, columnas, tamaño y último uso."""
+    rows = []
+    for key in _versions(base_dir):
+        path = store_path(key, base_dir)
+        files = [os.path.join(path, f) for f in os.listdir(path)]
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        rows.append({
+            "version": key,
+            "rows": int(meta["rows"]),
+            "columns": len(meta["columns"]),
+            "size_mb": sum(os.path.getsize(f) for f in files) / 1024 ** 2,
+            "last_used": pd.Timestamp(os.stat(path).st_mtime_ns, unit="ns"),
+        })
+    out = pd.DataFrame(rows, columns=["version", "rows", "columns", "size_mb", "last_used"])
+    return out.sort_values("last_used", ascending=False, ignore_index=True)
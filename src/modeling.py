@@ -4,13 +4,18 @@ Modelos: retención (clasificación), frecuencia (regresión) y propensión.
 Autor: CMSR92
 """
 from __future__ import annotations
+import copy
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import os
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
@@ -23,10 +28,33 @@ from sklearn.metrics import (
     r2_score,
     mean_absolute_error,
 )
-from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.linear_model import LogisticRegression, Ridge, SGDClassifier
 from sklearn.ensemble import RandomForestClassifier
 
+from .dtypes import DUMMY_PREFIXES
+from .feature_engineering import BASE_NUMERIC, ONE_HOT_COLUMNS, CategoricalFrame, SparseEncoder
+
 MODELS_DIR = os.path.join("models")
+# Caché de pasos de preprocesado ajustados (Pipeline(memory=...)), reutilizada entre corridas
+PIPELINE_CACHE_DIR = os.path.join("data", "cache", "pipeline")
+RETENTION_ALGORITHMS = ("rf", "lightgbm")
+LIGHTGBM_PARAMS: Dict[str, Any] = {
+    "n_estimators": 2000,  # tope: el número real lo fija la parada temprana
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "min_child_samples": 20,
+    "random_state": 42,
+    "verbose": -1,
+}
+EARLY_STOPPING_ROUNDS = 50
+VALIDATION_SIZE = 0.1
+# Checkpoint del modelo de propensión incremental (ver `update_propensity_model`)
+ONLINE_PROPENSITY_FILE = "propensity_online.joblib"
+RETENTION_PARAM_GRID: Dict[str, List[Any]] = {
+    "clf__n_estimators": [100, 200, 400],
+    "clf__max_depth": [None, 8, 16],
+    "clf__min_samples_leaf": [1, 5, 20],
+}
 
 
 @dataclass
@@ -44,6 +72,16 @@ def _split_xy(df: pd.DataFrame, target: str) -> Tuple[pd.DataFrame, pd.Series]:
     return X, y
 
 
+def _numeric_inputs(X: pd.DataFrame) -> List[str]:
+    """Columnas numéricas de entrada, sin dummies one-hot.
+
+    Las dummies son bool en modo normal (no numéricas) y uint8 en modo
+    compacto: se excluyen en ambos casos para que la política de tipos no
+    cambie las entradas del modelo.
+    """
+    return [c for c in X.select_dtypes(include="number").columns if not str(c).startswith(DUMMY_PREFIXES)]
+
+
 def evaluate_classification(y_true, y_pred, y_prob) -> ClassificationReport:
     return ClassificationReport(
         accuracy=accuracy_score(y_true, y_pred),
@@ -54,48 +92,132 @@ def evaluate_classification(y_true, y_pred, y_prob) -> ClassificationReport:
     )
 
 
-def train_retention_model(df_feat: pd.DataFrame, target: str = "Purchase_Again") -> Tuple[Pipeline, ClassificationReport]:
-    """Entrena un modelo de retención con pipeline simple (num scaler + RF)."""
+def train_retention_model(
+    df_feat: pd.DataFrame,
+    target: str = "Purchase_Again",
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    search: bool = False,
+    param_grid: Optional[Dict[str, List[Any]]] = None,
+    algorithm: str = "rf",
+) -> Tuple[Pipeline, ClassificationReport]:
+    """Entrena un modelo de retención con pipeline simple (num scaler + RF).
+
+    Con `algorithm="lightgbm"` usa gradient boosting por histogramas:
+    Movie_Genre/Seat_Type como categóricas nativas (pasar los datos limpios,
+    sin one-hot), parada temprana sobre un `VALIDATION_SIZE` del train y
+    entrenamiento multihilo (`n_jobs`).
+
+    Args:
+        df_feat: Features con la columna objetivo.
+        target: Columna objetivo.
+        n_jobs: Núcleos para el bosque y la búsqueda (-1 = todos).
+        cache_dir: Carpeta de caché del preprocesado ajustado (p. ej.
+            `PIPELINE_CACHE_DIR`); con los mismos datos no se reajusta entre
+            corridas ni entre candidatos de la búsqueda.
+        search: Si True, busca árboles, profundidad y hojas mínimas
+            (`param_grid`, por defecto `RETENTION_PARAM_GRID`) con halving
+            sucesivo sobre el número de filas y devuelve el mejor pipeline
+            (solo con RF).
+        algorithm: "rf" o "lightgbm".
+    Raises:
+        ValueError: si `algorithm` no es válido o se pide `search` con LightGBM.
+    """
+    if algorithm not in RETENTION_ALGORITHMS:
+        raise ValueError(f"algorithm debe ser uno de {RETENTION_ALGORITHMS}; recibido {algorithm!r}")
+    if search and algorithm != "rf":
+        raise ValueError("search solo está disponible con algorithm='rf'")
     X, y = _split_xy(df_feat, target)
 
     # Separación simple (estratificada si posible)
     stratify = y if y.nunique() > 1 else None
     X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42, stratify=stratify)
 
+    if algorithm == "lightgbm":
+        pipe = _fit_lightgbm(X_tr, y_tr, n_jobs=n_jobs)
+        y_prob = pipe.predict_proba(X_te)[:, 1]
+        return pipe, evaluate_classification(y_te, pipe.predict(X_te), y_prob)
+
     # Columnas numéricas
-    numeric_cols = X_tr.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    numeric_cols = _numeric_inputs(X_tr)
     pre = ColumnTransformer([
         ("num", StandardScaler(), numeric_cols)
     ], remainder="drop")
 
-    clf = RandomForestClassifier(n_estimators=200, random_state=42)
+    clf = RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=n_jobs)
 
     pipe = Pipeline([
         ("prep", pre),
         ("clf", clf)
-    ])
+    ], memory=cache_dir)
 
-    pipe.fit(X_tr, y_tr)
+    if search:
+        # Muchos candidatos con pocas filas; solo los mejores llegan al conjunto completo
+        halving = HalvingGridSearchCV(
+            pipe,
+            param_grid or RETENTION_PARAM_GRID,
+            factor=3,
+            resource="n_samples",
+            scoring="roc_auc",
+            cv=3,
+            n_jobs=n_jobs,
+            random_state=42,
+        )
+        halving.fit(X_tr, y_tr)
+        pipe = halving.best_estimator_
+    else:
+        pipe.fit(X_tr, y_tr)
     y_pred = pipe.predict(X_te)
     y_prob = pipe.predict_proba(X_te)[:, 1]
     report = evaluate_classification(y_te, y_pred, y_prob)
     return pipe, report
 
 
-def train_frequency_model(df_feat: pd.DataFrame, y_reg: pd.Series) -> Tuple[Pipeline, Dict[str, float]]:
-    """Entrena un modelo de frecuencia de visitas (regresión simple)."""
+def _fit_lightgbm(X_tr: pd.DataFrame, y_tr: pd.Series, n_jobs: Optional[int] = None) -> Pipeline:
+    """LightGBM con categóricas nativas y parada temprana sobre una validación del train."""
+    import lightgbm as lgb
+
+    stratify = y_tr if y_tr.nunique() > 1 else None
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_tr, y_tr, test_size=VALIDATION_SIZE, random_state=42, stratify=stratify
+    )
+    prep = CategoricalFrame().fit(X_fit)
+    clf = lgb.LGBMClassifier(**LIGHTGBM_PARAMS, n_jobs=n_jobs if n_jobs is not None else -1)
+    X_val = prep.transform(X_val)
+    # lightgbm >= 4.7 recibe la validación como eval_X/eval_y (eval_set queda obsoleto)
+    if "eval_X" in inspect.signature(clf.fit).parameters:
+        validation = {"eval_X": X_val, "eval_y": y_val}
+    else:
+        validation = {"eval_set": [(X_val, y_val)]}
+    clf.fit(
+        prep.transform(X_fit),
+        y_fit,
+        eval_metric="auc",
+        callbacks=[lgb.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)],
+        **validation,
+    )
+    return Pipeline([("prep", prep), ("clf", clf)])
+
+
+def train_frequency_model(
+    df_feat: pd.DataFrame, y_reg: pd.Series, cache_dir: Optional[str] = None
+) -> Tuple[Pipeline, Dict[str, float]]:
+    """Entrena un modelo de frecuencia de visitas (regresión simple).
+
+    `cache_dir` cachea el preprocesado ajustado (ver `train_retention_model`).
+    """
     X = df_feat.copy()
     y = y_reg.astype(float)
 
     X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42)
-    numeric_cols = X_tr.select_dtypes(include=["int64", "float64"]).columns.tolist()
+    numeric_cols = _numeric_inputs(X_tr)
 
     pre = ColumnTransformer([
         ("num", StandardScaler(), numeric_cols)
     ], remainder="drop")
 
     reg = Ridge(alpha=1.0)
-    pipe = Pipeline([("prep", pre), ("reg", reg)])
+    pipe = Pipeline([("prep", pre), ("reg", reg)], memory=cache_dir)
     pipe.fit(X_tr, y_tr)
 
     y_hat = pipe.predict(X_te)
@@ -106,19 +228,41 @@ def train_frequency_model(df_feat: pd.DataFrame, y_reg: pd.Series) -> Tuple[Pipe
     return pipe, metrics
 
 
-def train_propensity_model(df_feat: pd.DataFrame, target: str = "Purchase_Again") -> Tuple[Pipeline, ClassificationReport]:
-    """Modelo alternativo simple (Logistic Regression) para propensión."""
+def train_propensity_model(
+    df_feat: pd.DataFrame,
+    target: str = "Purchase_Again",
+    sparse: Optional[str] = None,
+    categorical: Optional[Sequence[str]] = None,
+    n_buckets: int = 2 ** 18,
+    cache_dir: Optional[str] = None,
+) -> Tuple[Pipeline, ClassificationReport]:
+    """Modelo alternativo simple (Logistic Regression) para propensión.
+
+    Con `sparse="hashing"` o `"vocabulary"`, `df_feat` puede ser el DataFrame
+    limpio: las columnas `categorical` (por defecto género y asiento, más las de
+    alta cardinalidad que se indiquen) se codifican en una matriz CSR con
+    `SparseEncoder` y la regresión se ajusta sobre ella sin densificar.
+    `cache_dir` cachea el preprocesado ajustado (ver `train_retention_model`).
+    """
     X, y = _split_xy(df_feat, target)
     stratify = y if y.nunique() > 1 else None
     X_tr, X_te, y_tr, y_te = train_test_split(X, y, test_size=0.2, random_state=42, stratify=stratify)
 
-    numeric_cols = X_tr.select_dtypes(include=["int64", "float64"]).columns.tolist()
-    pre = ColumnTransformer([
-        ("num", StandardScaler(), numeric_cols)
-    ], remainder="drop")
+    if sparse is not None:
+        pre = SparseEncoder(
+            categorical=tuple(categorical or ONE_HOT_COLUMNS),
+            numeric=tuple(BASE_NUMERIC),
+            encoding=sparse,
+            n_buckets=n_buckets,
+        )
+    else:
+        numeric_cols = _numeric_inputs(X_tr)
+        pre = ColumnTransformer([
+            ("num", StandardScaler(), numeric_cols)
+        ], remainder="drop")
 
     clf = LogisticRegression(max_iter=1000)
-    pipe = Pipeline([("prep", pre), ("clf", clf)])
+    pipe = Pipeline([("prep", pre), ("clf", clf)], memory=cache_dir)
     pipe.fit(X_tr, y_tr)
 
     y_pred = pipe.predict(X_te)
@@ -127,6 +271,256 @@ def train_propensity_model(df_feat: pd.DataFrame, target: str = "Purchase_Again"
     return pipe, report
 
 
+class IncrementalPropensityModel:
+    """Propensión con aprendizaje incremental (regresión logística por SGD).
+
+    Cada `partial_fit` actualiza las medias y varianzas acumuladas del
+    escalado (`StandardScaler.partial_fit`) y da una pasada de SGD sobre el
+    lote, así el costo de una actualización depende solo de las filas nuevas.
+    Las columnas se fijan en el primer lote (numéricas, como
+    `train_propensity_model`); en los siguientes, las que falten (p. ej. un
+    dummy sin casos) valen cero y las nuevas se ignoran.
+    """
+
+    def __init__(self, alpha: float = 1e-4, random_state: int = 42) -> None:
+        self.scaler = StandardScaler()
+        # Con pesos promediados (ASGD) la AUC no oscila de un lote a otro
+        self.clf = SGDClassifier(loss="log_loss", alpha=alpha, average=True, random_state=random_state)
+        self.feature_names_: List[str] = []
+        self.n_batches_ = 0
+
+    @property
+    def n_samples_seen_(self) -> int:
+        return int(getattr(self.scaler, "n_samples_seen_", 0))
+
+    def _matrix(self, X: pd.DataFrame) -> np.ndarray:
+        return X.reindex(columns=self.feature_names_, fill_value=0).to_numpy(dtype="float64")
+
+    def partial_fit(self, df_feat: pd.DataFrame, target: str = "Purchase_Again") -> "IncrementalPropensityModel":
+        """Actualiza escalado y coeficientes con un lote de features (con la columna objetivo)."""
+        X, y = _split_xy(df_feat, target)
+        if not self.feature_names_:
+            self.feature_names_ = _numeric_inputs(X)
+        arr = self._matrix(X)
+        self.scaler.partial_fit(arr)
+        self.clf.partial_fit(self.scaler.transform(arr), y.to_numpy(), classes=np.array([0, 1]))
+        self.n_batches_ += 1
+        return self
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        return self.clf.predict_proba(self.scaler.transform(self._matrix(X)))
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.clf.predict(self.scaler.transform(self._matrix(X)))
+
+
+def update_propensity_model(
+    batch: pd.DataFrame,
+    target: str = "Purchase_Again",
+    filename: str = ONLINE_PROPENSITY_FILE,
+) -> Tuple[IncrementalPropensityModel, Optional[ClassificationReport]]:
+    """Actualiza el checkpoint de propensión incremental con un lote nuevo.
+
+    Carga `filename` de models/ (o empieza uno nuevo), evalúa el modelo sobre
+    el lote antes de aprender de él (evaluación prequential: datos aún no
+    vistos), aplica `partial_fit` y guarda el checkpoint de forma atómica.
+
+    Returns:
+        (modelo actualizado, reporte sobre el lote; None si es el primero)
+    """
+    path = os.path.join(MODELS_DIR, filename)
+    model = joblib.load(path) if os.path.exists(path) else IncrementalPropensityModel()
+    report = None
+    if model.n_batches_:
+        X, y = _split_xy(batch, target)
+        report = evaluate_classification(y, model.predict(X), model.predict_proba(X)[:, 1])
+    model.partial_fit(batch, target)
+
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    joblib.dump(model, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return model, report
+
+
+def compare_incremental_vs_retrain(
+    df_feat: pd.DataFrame,
+    target: str = "Purchase_Again",
+    n_batches: int = 10,
+    retrain_every: int = 5,
+) -> pd.DataFrame:
+    """AUC del modelo incremental frente a un reentrenamiento completo periódico.
+
+    Parte `df_feat` (en orden, p. ej. cronológico) en `n_batches` lotes. Cada
+    lote se puntúa con ambos modelos antes de aprender de él; después el
+    incremental hace `partial_fit` con el lote y el completo se reajusta
+    (LogisticRegression sobre todo el historial) solo cada `retrain_every`
+    lotes, como un reentrenamiento programado.
+
+    Returns:
+        Una fila por lote evaluado: filas vistas antes del lote, AUC de cada modelo, su
+        diferencia (incremental − completo) y segundos de actualización.
+    Raises:
+        ValueError: si `retrain_every` es menor que 1.
+    """
+    if retrain_every < 1:
+        raise ValueError(f"retrain_every debe ser al menos 1; recibido {retrain_every!r}")
+    batches = np.array_split(np.arange(len(df_feat)), n_batches)
+    online = IncrementalPropensityModel()
+    full: Optional[Pipeline] = None
+    rows = []
+    for i, idx in enumerate(batches):
+        batch = df_feat.iloc[idx]
+        if i:
+            X, y = _split_xy(batch, target)
+            auc_online = evaluate_classification(y, online.predict(X), online.predict_proba(X)[:, 1]).roc_auc
+            auc_full = evaluate_classification(y, full.predict(X), full.predict_proba(X)[:, 1]).roc_auc
+        seen = online.n_samples_seen_
+        start = time.perf_counter()
+        online.partial_fit(batch, target)
+        online_seconds = time.perf_counter() - start
+        full_seconds = 0.0
+        if i % retrain_every == 0:
+            start = time.perf_counter()
+            X_hist, y_hist = _split_xy(df_feat.iloc[: idx[-1] + 1], target)
+            full = Pipeline([
+                ("prep", ColumnTransformer([("num", StandardScaler(), online.feature_names_)], remainder="drop")),
+                ("clf", LogisticRegression(max_iter=1000)),
+            ]).fit(X_hist, y_hist)
+            full_seconds = time.perf_counter() - start
+        if i:
+            rows.append({
+                "batch": i,
+                "rows_seen": seen,
+                "auc_incremental": auc_online,
+                "auc_full_retrain": auc_full,
+                "auc_gap": auc_online - auc_full,
+                "seconds_incremental": online_seconds,
+                "seconds_full_retrain": full_seconds,
+            })
+    return pd.DataFrame(rows)
+
+
+@dataclass
+class PreparedData:
+    """Split y preprocesado compartidos: arreglos ya escalados y el transformador ajustado."""
+    prep: ColumnTransformer
+    X_tr: np.ndarray
+    X_te: np.ndarray
+    y_tr: np.ndarray
+    y_te: np.ndarray
+    y_reg_tr: Optional[np.ndarray]
+    y_reg_te: Optional[np.ndarray]
+
+
+@dataclass
+class TrainedModel:
+    model: Pipeline
+    report: Any  # ClassificationReport o métricas de regresión
+    seconds: float
+
+
+def _prepare(df_feat: pd.DataFrame, target: str, y_reg: Optional[pd.Series]) -> PreparedData:
+    X, y = _split_xy(df_feat, target)
+    stratify = y if y.nunique() > 1 else None
+    idx_tr, idx_te = train_test_split(np.arange(len(X)), test_size=0.2, random_state=42, stratify=stratify)
+    X_tr, X_te = X.iloc[idx_tr], X.iloc[idx_te]
+
+    numeric_cols = _numeric_inputs(X_tr)
+    prep = ColumnTransformer([
+        ("num", StandardScaler(), numeric_cols)
+    ], remainder="drop")
+    y_reg = None if y_reg is None else np.asarray(y_reg, dtype=float)
+    return PreparedData(
+        prep=prep,
+        X_tr=prep.fit_transform(X_tr),
+        X_te=prep.transform(X_te),
+        y_tr=y.to_numpy()[idx_tr],
+        y_te=y.to_numpy()[idx_te],
+        y_reg_tr=None if y_reg is None else y_reg[idx_tr],
+        y_reg_te=None if y_reg is None else y_reg[idx_te],
+    )
+
+
+def prepare_training_data(
+    df_feat: pd.DataFrame,
+    target: str = "Purchase_Again",
+    y_reg: Optional[pd.Series] = None,
+    cache_dir: Optional[str] = None,
+) -> PreparedData:
+    """Un solo split estratificado y un solo ajuste del escalado para todos los modelos.
+
+    Con `cache_dir` el resultado se guarda en disco (joblib.Memory, clave =
+    hash de los datos), así otra corrida sobre los mismos datos no repite el
+    preprocesado.
+    """
+    if cache_dir is None:
+        return _prepare(df_feat, target, y_reg)
+    return joblib.Memory(cache_dir, verbose=0).cache(_prepare)(df_feat, target, y_reg)
+
+
+def _fit_classifier(clf, data: PreparedData) -> TrainedModel:
+    start = time.perf_counter()
+    clf.fit(data.X_tr, data.y_tr)
+    y_prob = clf.predict_proba(data.X_te)[:, 1]
+    report = evaluate_classification(data.y_te, clf.predict(data.X_te), y_prob)
+    # Copia propia del preprocesado ya ajustado: el pipeline acepta DataFrames como
+    # los demás y reajustar uno no altera a los otros
+    return TrainedModel(Pipeline([("prep", copy.deepcopy(data.prep)), ("clf", clf)]), report, time.perf_counter() - start)
+
+
+def _fit_regressor(reg, data: PreparedData) -> TrainedModel:
+    start = time.perf_counter()
+    reg.fit(data.X_tr, data.y_reg_tr)
+    y_hat = reg.predict(data.X_te)
+    metrics = {
+        "r2": float(r2_score(data.y_reg_te, y_hat)),
+        "mae": float(mean_absolute_error(data.y_reg_te, y_hat)),
+    }
+    return TrainedModel(Pipeline([("prep", copy.deepcopy(data.prep)), ("reg", reg)]), metrics, time.perf_counter() - start)
+
+
+def train_all_models(
+    df_feat: pd.DataFrame,
+    y_reg: Optional[pd.Series] = None,
+    target: str = "Purchase_Again",
+    n_jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+) -> Tuple[Dict[str, TrainedModel], float]:
+    """Entrena retención (RF), propensión (LR) y frecuencia (Ridge) sobre un split común.
+
+    Separa y escala una sola vez (`prepare_training_data`) y entrena los
+    modelos a la vez en hilos (sklearn libera el GIL al ajustar). La
+    frecuencia solo se entrena si se pasa `y_reg` (alineada con `df_feat`).
+    Cada modelo recibe su propia copia del preprocesado ajustado.
+
+    La frecuencia usa el split estratificado por `target` y excluye esa
+    columna de las entradas, así que sus métricas no son comparables con
+    las de `train_frequency_model` (split aleatorio y `target` como entrada).
+
+    Args:
+        df_feat: Features con la columna objetivo.
+        y_reg: Objetivo de la regresión de frecuencia (opcional).
+        target: Columna objetivo de clasificación.
+        n_jobs: Núcleos del bosque aleatorio.
+        cache_dir: Caché en disco de los arreglos preprocesados.
+    Returns:
+        ({"retention" | "propensity" | "frequency": TrainedModel}, segundos de preprocesado)
+    """
+    start = time.perf_counter()
+    data = prepare_training_data(df_feat, target=target, y_reg=y_reg, cache_dir=cache_dir)
+    prep_seconds = time.perf_counter() - start
+
+    jobs = {
+        "retention": (_fit_classifier, RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=n_jobs)),
+        "propensity": (_fit_classifier, LogisticRegression(max_iter=1000)),
+    }
+    if y_reg is not None:
+        jobs["frequency"] = (_fit_regressor, Ridge(alpha=1.0))
+    with ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = {name: ex.submit(fit, est, data) for name, (fit, est) in jobs.items()}
+        return {name: f.result() for name, f in futures.items()}, prep_seconds
+
+
 def save_model(model: Pipeline, filename: str) -> str:
     os.makedirs(MODELS_DIR, exist_ok=True)
     path = os.path.join(MODELS_DIR, filename)
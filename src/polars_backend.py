@@ -0,0 +1,205 @@
+"""Backend polars para limpieza y features (en español)
+
+Mismas funciones públicas y mismo resultado que la ruta pandas de
+`data_processing` y `feature_engineering`, pero expresadas como un plan
+lazy de polars que se ejecuta en varios hilos (lectura CSV, casts,
+normalización de texto, deduplicación y one-hot). Entradas y salidas siguen
+siendo DataFrames de pandas, con el mismo índice, columnas y dtypes.
+Se selecciona con `backend="polars"` o `CINE_BACKEND=polars` (ver
+`src.backends`); requiere el paquete `polars`.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import os
+from typing import List
+import pandas as pd
+import polars as pl
+
+from .data_processing import PROCESSED_DIR, TRUE_VALUES, essential_columns, resolve_sources
+from .dtypes import compact_dtypes
+from .feature_engineering import AGE_BINS, AGE_LABELS
+
+# Tokens que pandas.read_csv interpreta como nulos por defecto
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+ONE_HOT = ["Movie_Genre", "Seat_Type"]
+_ROW = "__row"
+
+
+_BOOL_TOKENS = ["True", "False", "true", "false", "TRUE", "FALSE"]
+
+
+def _infer_like_pandas(frame: pl.DataFrame) -> pl.DataFrame:
+    """Tipa columnas leídas como texto con la misma regla que pandas.read_csv.
+
+    Entera si todos los no nulos son enteros (float64 si además hay nulos),
+    flotante si todos son números, bool si solo hay True/False y texto en otro
+    caso. Evita inferir el esquema escaneando el archivo completo.
+    """
+    casts = []
+    for name, dtype in frame.schema.items():
+        if dtype != pl.String:
+            continue
+        col = frame.get_column(name)
+        nulls = col.null_count()
+        if nulls == len(col):
+            casts.append(pl.col(name).cast(pl.Float64))
+        elif col.cast(pl.Int64, strict=False).null_count() == nulls:
+            casts.append(pl.col(name).cast(pl.Float64 if nulls else pl.Int64))
+        elif col.cast(pl.Float64, strict=False).null_count() == nulls:
+            casts.append(pl.col(name).cast(pl.Float64))
+        elif nulls == 0 and col.is_in(_BOOL_TOKENS).all():
+            casts.append(pl.col(name).str.to_lowercase() == "true")
+    return frame.with_columns(casts) if casts else frame
+
+
+def _read(path: str) -> pl.DataFrame:
+    frames = [pl.read_csv(p, infer_schema=False, null_values=NA_VALUES) for p in resolve_sources(path)]
+    return _infer_like_pandas(frames[0] if len(frames) == 1 else pl.concat(frames))
+
+
+def load_data(path: str) -> pd.DataFrame:
+    """Lee uno o varios CSV (archivo, directorio o glob) con el lector multihilo de polars.
+
+    Los tipos se infieren como en pandas (ver `_infer_like_pandas`), así una
+    columna con valores como "Alone" queda como texto igual que en pandas.
+    """
+    return _read(path).to_pandas()
+
+
+def _numeric(name: str, dtype: pl.DataType, lower: float) -> pl.Expr:
+    col = pl.col(name)
+    if not dtype.is_numeric():
+        col = col.cast(pl.Float64, strict=False)
+    return col.clip(lower_bound=lower)
+
+
+def _title(name: str) -> pl.Expr:
+    # Igual que astype(str).str.strip().str.title(): los nulos pasan a "nan" → "Nan"
+    return pl.col(name).cast(pl.String).fill_null("nan").str.strip_chars().str.to_titlecase()
+
+
+def _target(dtype: pl.DataType) -> pl.Expr:
+    col = pl.col("Purchase_Again")
+    if dtype == pl.Boolean:
+        return col.cast(pl.Int8)
+    if dtype.is_integer():
+        return col
+    return col.cast(pl.String).str.to_lowercase().is_in(TRUE_VALUES).fill_null(False).cast(pl.Int64)
+
+
+def _is_normalized_category(s: pd.Series) -> bool:
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        return False
+    cats = s.cat.categories
+    return bool((cats.astype(str).str.strip().str.title() == cats).all())
+
+
+def _clean_plan(frame: pl.DataFrame, keep_categories=()) -> pl.LazyFrame:
+    schema = frame.schema
+    exprs = [
+        _numeric("Age", schema["Age"], 0),
+        _numeric("Ticket_Price", schema["Ticket_Price"], 0),
+        _numeric("Number_of_Person", schema["Number_of_Person"], 1),
+        _target(schema["Purchase_Again"]),
+    ]
+    exprs += [_title(c) for c in ["Movie_Genre", "Seat_Type"] if c not in keep_categories]
+    return (
+        frame.lazy()
+        .with_columns(exprs)
+        .unique(keep="first", maintain_order=True)
+        .with_row_index(_ROW)
+        .drop_nulls(subset=["Age", "Ticket_Price", "Number_of_Person"])
+    )
+
+
+def _to_pandas_clean(lf: pl.LazyFrame) -> pd.DataFrame:
+    out = lf.collect().to_pandas()
+    out.index = pd.Index(out.pop(_ROW).to_numpy().astype("int64"))
+    return out
+
+
+def basic_clean(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """Equivalente polars de `data_processing.basic_clean` (mismo índice y dtypes)."""
+    df = df.rename(columns=lambda c: c.strip())
+    missing = [c for c in essential_columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas esenciales: {missing}")
+
+    keep_categories = {c: df[c].dtype for c in ["Movie_Genre", "Seat_Type"] if _is_normalized_category(df[c])}
+    out = _to_pandas_clean(_clean_plan(pl.from_pandas(df), keep_categories))
+    for c, dtype in keep_categories.items():
+        out[c] = out[c].cat.set_categories(dtype.categories)
+
+    if compact:
+        out = compact_dtypes(out, stage="clean")
+    return out
+
+
+def load_and_clean(path: str, compact: bool = False) -> pd.DataFrame:
+    """`basic_clean(load_data(path))` en un solo plan: sin pasar por pandas entre etapas."""
+    frame = _read(path)
+    frame = frame.rename({c: c.strip() for c in frame.columns})
+    missing = [c for c in essential_columns if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas esenciales: {missing}")
+    out = _to_pandas_clean(_clean_plan(frame))
+    if compact:
+        out = compact_dtypes(out, stage="clean")
+    return out
+
+
+def _levels(s: pd.Series) -> List[str]:
+    # Mismas categorías que get_dummies: todas las de un category, o los valores únicos ordenados
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return list(s.cat.categories)
+    return sorted(s.dropna().unique().tolist())
+
+
+def create_features(df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+    """Equivalente polars de `feature_engineering.create_features` (mismas columnas y orden)."""
+    dummy_dtype = pl.UInt8 if compact else pl.Boolean
+    price = pl.col("Ticket_Price")
+    age = pl.col("Age")
+
+    dummies = []
+    for c in ONE_HOT:
+        col = pl.col(c).cast(pl.String)
+        dummies += [(col == str(v)).fill_null(False).cast(dummy_dtype).alias(f"{c}_{v}") for v in _levels(df[c])[1:]]
+    # age_group: intervalos (bins[i], bins[i+1]] con el primero cerrado en 0, sin materializar la etiqueta
+    for i, label in enumerate(AGE_LABELS[1:], start=1):
+        in_bin = (age > AGE_BINS[i]) & (age <= AGE_BINS[i + 1])
+        dummies.append(in_bin.fill_null(False).cast(dummy_dtype).alias(f"age_group_{label}"))
+
+    # Solo las columnas de entrada pasan a polars; el resto (p. ej. Ticket_ID) se queda en pandas
+    inputs = ["Age", "Ticket_Price", "Number_of_Person"] + ONE_HOT
+    new = (
+        pl.from_pandas(df[inputs])
+        .lazy()
+        .select(
+            [
+                (price.fill_null(0) * pl.col("Number_of_Person").fill_null(1)).alias("gasto_total_est"),
+                price.fill_null(price.median()).alias("gasto_promedio"),
+            ]
+            + dummies
+        )
+        .collect()
+        .to_pandas()
+    )
+    new.index = df.index
+    derived = ONE_HOT + ["age_group", "gasto_total_est", "gasto_promedio"]
+    out = pd.concat([df[[c for c in df.columns if c not in derived]].copy(), new], axis=1)
+
+    if compact:
+        out = compact_dtypes(out, stage="features")
+    return out
+
+
+def save_csv(df: pd.DataFrame, filename: str, base_dir: str = PROCESSED_DIR) -> str:
+    """Escribe `df` como CSV con el escritor multihilo de polars y devuelve la ruta."""
+    os.makedirs(base_dir, exist_ok=True)
+    path = os.path.join(base_dir, filename)
+    pl.from_pandas(df).write_csv(path)
+    return path
@@ -0,0 +1,101 @@
+"""Predictor compilado de propensión para scoring fila a fila (en español)
+
+Convierte el pipeline de `train_propensity_model` (ColumnTransformer →
+StandardScaler → LogisticRegression) en un objeto mínimo: el escalado se
+pliega en los coeficientes (w' = w / σ, b' = b − Σ w·μ / σ), así una fila se
+puntúa con un producto punto en Python puro, sin DataFrames ni sklearn.
+Se guarda como JSON junto a los modelos.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import json
+import math
+import os
+from operator import mul
+from typing import Any, Dict, List, Mapping, Sequence, Union
+
+import numpy as np
+
+MODELS_DIR = os.path.join("models")
+PREDICTOR_FILE = "propensity_predictor.json"
+
+Row = Union[Mapping[str, float], Sequence[float]]
+
+
+class LogisticPredictor:
+    """Regresión logística con el escalado ya plegado.
+
+    Args:
+        features: Nombres de las columnas, en el orden de `weights`.
+        weights: Coeficientes sobre las features sin escalar.
+        intercept: Término independiente ya corregido por el escalado.
+    """
+
+    __slots__ = ("features", "weights", "intercept", "_weights_array")
+
+    def __init__(self, features: Sequence[str], weights: Sequence[float], intercept: float) -> None:
+        if len(features) != len(weights):
+            raise ValueError(f"{len(features)} features y {len(weights)} coeficientes")
+        self.features = tuple(features)
+        self.weights = tuple(float(w) for w in weights)
+        self.intercept = float(intercept)
+        self._weights_array = np.asarray(self.weights)
+
+    def predict_proba_row(self, row: Row) -> float:
+        """Probabilidad de la clase positiva para una fila (dict por nombre o secuencia en orden)."""
+        values = [row[f] for f in self.features] if isinstance(row, Mapping) else row
+        z = self.intercept + sum(map(mul, self.weights, values))
+        # Sigmoide estable para |z| grande
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Probabilidades de un lote: arreglo (n, n_features) o DataFrame con las columnas `features`."""
+        arr = X[list(self.features)].to_numpy(dtype=float) if hasattr(X, "columns") else np.asarray(X, dtype=float)
+        z = arr @ self._weights_array + self.intercept
+        return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"features": list(self.features), "weights": list(self.weights), "intercept": self.intercept}
+
+    def save(self, filename: str = PREDICTOR_FILE) -> str:
+        os.makedirs(MODELS_DIR, exist_ok=True)
+        path = os.path.join(MODELS_DIR, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, filename: str = PREDICTOR_FILE) -> "LogisticPredictor":
+        with open(os.path.join(MODELS_DIR, filename), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["features"], data["weights"], data["intercept"])
+
+
+def compile_logistic(pipe) -> LogisticPredictor:
+    """Pliega el escalado del pipeline de propensión en los coeficientes de la logística.
+
+    Espera `Pipeline([("prep", ColumnTransformer([("num", StandardScaler(), cols)])),
+    ("clf", LogisticRegression)])` ajustado y binario, como devuelve
+    `modeling.train_propensity_model` (modo denso).
+
+    Raises:
+        ValueError: si el pipeline no tiene esa forma.
+    """
+    prep, clf = pipe.named_steps.get("prep"), pipe.named_steps.get("clf")
+    if clf is None or not hasattr(clf, "coef_") or clf.coef_.shape[0] != 1:
+        raise ValueError("Se esperaba un paso 'clf' con una regresión logística binaria ajustada")
+    transformers = [t for t in getattr(prep, "transformers_", []) if t[0] != "remainder"]
+    if len(transformers) != 1 or not hasattr(transformers[0][1], "scale_"):
+        raise ValueError("Se esperaba un paso 'prep' con un único StandardScaler sobre columnas numéricas")
+
+    _, scaler, columns = transformers[0]
+    coef = clf.coef_[0]
+    mean = scaler.mean_ if scaler.with_mean else np.zeros_like(coef)
+    scale = scaler.scale_ if scaler.with_std else np.ones_like(coef)
+    weights = coef / scale
+    intercept = float(clf.intercept_[0] - np.dot(weights, mean))
+    features: List[str] = [str(c) for c in columns]
+    return LogisticPredictor(features, weights.tolist(), intercept)
@@ -1,11 +1,20 @@
 """Optimización de precios y métricas financieras (en español)
 
-Incluye funciones para break-even, ROI y simulación de escenarios.
+Incluye funciones para break-even, ROI, simulación de escenarios y la curva
+de beneficio por umbral para campañas de retención.
 Autor: CMSR92
 """
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import math
+import numpy as np
+import pandas as pd
+
+# Escenario base del análisis de precios (suscripción anual)
+DEFAULT_PRICE = 180.0
+DEFAULT_VARIABLE_COST = 80.0
+# Costo supuesto de contactar a un cliente en la campaña (oferta, envío)
+DEFAULT_CONTACT_COST = 10.0
 
 
 def break_even(price: float, fixed_costs: float, variable_cost_per_customer: float) -> float:
@@ -56,3 +65,77 @@ def simulate_pricing_scenarios(
             "is_profitable": contrib_margin > fixed_costs,
         })
     return results
+
+
+def profit_curve(
+    y_prob,
+    y_true=None,
+    price: float = DEFAULT_PRICE,
+    variable_cost_per_customer: float = DEFAULT_VARIABLE_COST,
+    contact_cost: float = DEFAULT_CONTACT_COST,
+    fixed_costs: float = 0.0,
+    max_points: Optional[int] = None,
+) -> Tuple[pd.DataFrame, Dict[str, float]]:
+    """Precisión, recall, ingresos, costos y beneficio de la campaña en cada umbral.
+
+    Se contacta a quien tenga `y_prob >= umbral`; cada conversión aporta
+    `price` e incurre en `variable_cost_per_customer`, y cada contacto cuesta
+    `contact_cost`. Un solo ordenamiento descendente más sumas acumuladas
+    dan todos los umbrales distintos a la vez (O(n log n)). Sin `y_true`
+    (clientes aún sin etiqueta), las conversiones son las esperadas: la suma
+    de probabilidades.
+
+    Args:
+        y_prob: Probabilidades de recompra.
+        y_true: Etiquetas 0/1 del test (opcional).
+        price: Precio de la suscripción.
+        variable_cost_per_customer: Costo variable por suscriptor.
+        contact_cost: Costo por cliente contactado.
+        fixed_costs: Costos fijos de la campaña (no cambian el umbral óptimo).
+        max_points: Si se indica, la curva devuelta se submuestrea a unos
+            `max_points` umbrales; el óptimo se busca siempre en todos.
+    Returns:
+        (curva con una fila por umbral, de mayor a menor, empezando por la de
+        no contactar a nadie; fila del umbral que maximiza el beneficio como dict)
+    """
+    y_prob = np.asarray(y_prob, dtype="float64")
+    order = np.argsort(y_prob)[::-1]  # el orden entre empates no importa: se agrupan
+    prob_sorted = y_prob[order]
+    conversions = prob_sorted if y_true is None else np.asarray(y_true)[order]
+    del order
+
+    # Último índice de cada grupo de probabilidades iguales: un umbral por valor distinto
+    ends = np.flatnonzero(prob_sorted[1:] != prob_sorted[:-1])
+    ends = np.append(ends, len(prob_sorted) - 1) if len(prob_sorted) else ends
+    # Fila 0: umbral por encima del máximo, no se contacta a nadie (beneficio
+    # −fixed_costs); así nunca se recomienda una campaña que pierde dinero
+    top = prob_sorted[0] if len(prob_sorted) else 1.0
+    thresholds = np.concatenate(([np.nextafter(top, np.inf)], prob_sorted[ends]))
+    converted = np.concatenate(([0.0], np.cumsum(conversions, dtype="float64")[ends]))
+    del conversions
+    contacted = np.concatenate(([0.0], ends + 1.0))
+    total = converted[-1]
+    profit = converted * (price - variable_cost_per_customer) - contacted * contact_cost - fixed_costs
+
+    # Solo las filas devueltas se materializan: con decenas de millones de
+    # umbrales, la curva completa no cabría en memoria varias veces
+    rows = np.arange(len(thresholds))
+    if max_points is not None and len(thresholds) > max_points:
+        rows = np.unique(np.linspace(0, len(thresholds) - 1, max_points).astype("int64"))
+    best_row = int(np.argmax(profit))
+
+    def table(idx: np.ndarray) -> pd.DataFrame:
+        conv, cont = converted[idx], contacted[idx]
+        return pd.DataFrame({
+            "threshold": thresholds[idx],
+            "contacted": cont.astype("int64"),
+            "conversions": conv,
+            "precision": np.divide(conv, cont, out=np.zeros_like(conv), where=cont > 0),
+            "recall": conv / total if total > 0 else np.zeros_like(conv),
+            "revenue": conv * price,
+            "cost": conv * variable_cost_per_customer + cont * contact_cost + fixed_costs,
+            "profit": profit[idx],
+        })
+
+    best = {k: float(v) for k, v in table(np.array([best_row])).iloc[0].items()}
+    return table(rows), best
@@ -0,0 +1,179 @@
+"""Registro local de modelos (en español)
+
+Guarda cada modelo como una versión en models/registry/<nombre>/v<n>/ junto
+con sus metadatos (esquema de features, métricas, huella de los datos,
+tamaño y versiones de librerías). Los modelos se guardan sin comprimir para
+poder abrir sus arreglos numpy con `mmap`, y los ya cargados se conservan en
+una caché LRU del proceso, así dashboard y scoring no deserializan en cada
+llamada.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import dataclasses
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+import joblib
+import pandas as pd
+import sklearn
+
+from .feature_store import frame_fingerprint
+from .modeling import MODELS_DIR
+
+REGISTRY_DIR = os.path.join(MODELS_DIR, "registry")
+MODEL_FILE = "model.joblib"
+META_FILE = "meta.json"
+CACHE_ENTRIES = 8
+
+_cache: "OrderedDict[Tuple[str, int, bool], Any]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _model_dir(name: str, version: str, base_dir: str) -> str:
+    return os.path.join(base_dir, name, version)
+
+
+def list_versions(name: str, base_dir: str = REGISTRY_DIR) -> list:
+    """Versiones registradas de `name`, de la más antigua a la más reciente."""
+    path = os.path.join(base_dir, name)
+    if not os.path.isdir(path):
+        return []
+    versions = [v for v in os.listdir(path) if v.startswith("v") and v[1:].isdigit()]
+    return sorted(versions, key=lambda v: int(v[1:]))
+
+
+def _resolve(name: str, version: Optional[str], base_dir: str) -> str:
+    versions = list_versions(name, base_dir)
+    if not versions:
+        raise FileNotFoundError(f"No hay versiones registradas de {name} en {base_dir}")
+    version = version or versions[-1]
+    if version not in versions:
+        raise FileNotFoundError(f"No existe la versión {version} de {name}; disponibles: {versions}")
+    return _model_dir(name, version, base_dir)
+
+
+def _jsonable(metrics: Any) -> Dict[str, Any]:
+    if metrics is None:
+        return {}
+    if dataclasses.is_dataclass(metrics):
+        metrics = dataclasses.asdict(metrics)
+    return {k: float(v) if isinstance(v, (int, float)) else v for k, v in dict(metrics).items()}
+
+
+def register_model(
+    model: Any,
+    name: str,
+    X: Optional[pd.DataFrame] = None,
+    metrics: Any = None,
+    params: Optional[Dict[str, Any]] = None,
+    base_dir: str = REGISTRY_DIR,
+) -> Dict[str, Any]:
+    """Guarda `model` como nueva versión de `name` y devuelve sus metadatos.
+
+    Args:
+        model: Estimador o pipeline ajustado.
+        name: Nombre lógico (p. ej. "retention").
+        X: Features de entrenamiento: de ellas salen el esquema (columna →
+            dtype) y la huella de los datos (`feature_store.frame_fingerprint`).
+        metrics: `ClassificationReport` o dict de métricas.
+        params: Metadatos adicionales (hiperparámetros, notas...).
+        base_dir: Carpeta del registro.
+    """
+    versions = list_versions(name, base_dir)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1}"
+    path = _model_dir(name, version, base_dir)
+    tmp_path = path + ".tmp"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    joblib.dump(model, os.path.join(tmp_path, MODEL_FILE))  # sin comprimir: admite mmap
+    meta = {
+        "name": name,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "model_class": type(model).__name__,
+        "feature_schema": {str(c): str(t) for c, t in X.dtypes.items()} if X is not None else {},
+        "data_fingerprint": frame_fingerprint(X) if X is not None else None,
+        "rows": int(len(X)) if X is not None else None,
+        "metrics": _jsonable(metrics),
+        "params": params or {},
+        "size_bytes": os.path.getsize(os.path.join(tmp_path, MODEL_FILE)),
+        "sklearn_version": sklearn.__version__,
+    }
+    with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return meta
+
+
+def model_metadata(name: str, version: Optional[str] = None, base_dir: str = REGISTRY_DIR) -> Dict[str, Any]:
+    """Metadatos de una versión (la más reciente si `version` es None)."""
+    with open(os.path.join(_resolve(name, version, base_dir), META_FILE), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_cached(path: str, mmap: bool) -> Any:
+    # La clave incluye el mtime: si el archivo se reescribe, se vuelve a cargar
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns, mmap)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    model = joblib.load(path, mmap_mode="r" if mmap else None)
+    with _lock:
+        _cache[key] = model
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return model
+
+
+def load_model(
+    name: str,
+    version: Optional[str] = None,
+    mmap: bool = True,
+    base_dir: str = REGISTRY_DIR,
+) -> Any:
+    """Carga un modelo registrado (o, si no lo está, el archivo `name` de models/).
+
+    Los arreglos numpy del modelo se abren con `mmap` de solo lectura (los
+    procesos comparten las páginas) y el objeto queda en la caché LRU: las
+    siguientes llamadas con el mismo archivo no deserializan. El modelo
+    devuelto se comparte; no volver a ajustarlo.
+
+    Raises:
+        FileNotFoundError: si no hay versiones de `name` ni archivo en models/.
+    """
+    if list_versions(name, base_dir):
+        path = os.path.join(_resolve(name, version, base_dir), MODEL_FILE)
+    else:
+        path = os.path.join(MODELS_DIR, name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No hay versiones registradas de {name} ni archivo {path}")
+    return _load_cached(path, mmap)
+
+
+def list_models(base_dir: str = REGISTRY_DIR) -> pd.DataFrame:
+    """Tabla de todas las versiones registradas con sus métricas principales."""
+    rows = []
+    if os.path.isdir(base_dir):
+        for name in sorted(os.listdir(base_dir)):
+            for version in list_versions(name, base_dir):
+                meta = model_metadata(name, version, base_dir)
+                rows.append({
+                    "name": name,
+                    "version": version,
+                    "created_at": meta["created_at"],
+                    "model_class": meta["model_class"],
+                    "rows": meta["rows"],
+                    "size_mb": meta["size_bytes"] / 1024 ** 2,
+                    **{f"metric_{k}": v for k, v in meta["metrics"].items()},
+                })
+    return pd.DataFrame(rows)
+
+
+def clear_cache() -> None:
+    """Vacía la caché de modelos cargados del proceso."""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,96 @@
+"""Cubo de agregados para el análisis de negocio (en español)
+
+Precalcula conteos y sumas por género × tipo de asiento × grupo de edad ×
+tamaño de grupo (más un bin de precio para el histograma), de modo que los
+KPIs y gráficos del tab de negocio se obtienen del cubo en tiempo constante,
+sin recorrer las transacciones. El cubo se actualiza sumando el de cada lote
+nuevo.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import os
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from .feature_engineering import AGE_BINS, AGE_LABELS
+from .storage import load_table, save_table, table_path
+
+PROCESSED_DIR = os.path.join("data", "processed")
+ROLLUP_NAME = "rollup_cube"
+PRICE_BIN_WIDTH = 1.0
+DIMENSIONS = ["Movie_Genre", "Seat_Type", "age_group", "Number_of_Person", "price_bin"]
+MEASURES = ["n", "sum_price", "sum_revenue", "sum_retention"]
+
+
+def build_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """Construye el cubo (formato tidy: dimensiones + medidas) a partir de datos limpios.
+
+    Medidas por celda: `n` transacciones, `sum_price` (Ticket_Price),
+    `sum_revenue` (Ticket_Price * Number_of_Person) y `sum_retention`
+    (Purchase_Again). `price_bin` es el límite inferior del bin de
+    `PRICE_BIN_WIDTH` USD.
+    """
+    price = df["Ticket_Price"].to_numpy(dtype="float64")
+    group = df["Number_of_Person"].to_numpy(dtype="float64")
+    keys = pd.DataFrame({
+        "Movie_Genre": df["Movie_Genre"].astype(str).to_numpy(),
+        "Seat_Type": df["Seat_Type"].astype(str).to_numpy(),
+        "age_group": pd.cut(df["Age"], bins=AGE_BINS, labels=AGE_LABELS, include_lowest=True).astype(str).to_numpy(),
+        "Number_of_Person": group,
+        "price_bin": np.floor(price / PRICE_BIN_WIDTH) * PRICE_BIN_WIDTH,
+        "n": np.ones(len(df), dtype="int64"),
+        "sum_price": price,
+        "sum_revenue": price * group,
+        "sum_retention": df["Purchase_Again"].to_numpy(dtype="int64"),
+    })
+    return keys.groupby(DIMENSIONS, as_index=False, sort=True)[MEASURES].sum()
+
+
+def update_rollup(cube: pd.DataFrame, df_delta: pd.DataFrame) -> pd.DataFrame:
+    """Suma al cubo existente el cubo de un lote nuevo (costo proporcional al lote y al cubo)."""
+    if df_delta is None or len(df_delta) == 0:
+        return cube
+    delta = build_rollup(df_delta)
+    if cube is None or len(cube) == 0:
+        return delta
+    merged = pd.concat([cube.astype({d: delta[d].dtype for d in DIMENSIONS}), delta], ignore_index=True)
+    return merged.groupby(DIMENSIONS, as_index=False, sort=True)[MEASURES].sum()
+
+
+def save_rollup(cube: pd.DataFrame, name: str = ROLLUP_NAME, base_dir: str = PROCESSED_DIR) -> str:
+    return save_table(cube, name, base_dir=base_dir)
+
+
+def load_rollup(name: str = ROLLUP_NAME, base_dir: str = PROCESSED_DIR):
+    """Lee el cubo guardado o devuelve None si no existe."""
+    if not os.path.exists(table_path(name, base_dir)):
+        return None
+    return load_table(name, base_dir=base_dir)
+
+
+def rollup_by(cube: pd.DataFrame, dimension: str) -> pd.DataFrame:
+    """Agrega el cubo por una dimensión con medias derivadas.
+
+    Columnas: n, sum_revenue, avg_price, retention_rate, indexadas por la dimensión.
+    """
+    g = cube.groupby(dimension, observed=True)[MEASURES].sum()
+    return pd.DataFrame({
+        "n": g["n"],
+        "sum_revenue": g["sum_revenue"],
+        "avg_price": g["sum_price"] / g["n"],
+        "retention_rate": g["sum_retention"] / g["n"],
+    })
+
+
+def summarize(cube: pd.DataFrame) -> Dict[str, float]:
+    """KPIs globales: transacciones, precio medio, personas por compra y tasa de retención."""
+    n = int(cube["n"].sum())
+    if n == 0:
+        return {"n": 0, "avg_ticket": float("nan"), "avg_group": float("nan"), "retention": float("nan")}
+    return {
+        "n": n,
+        "avg_ticket": float(cube["sum_price"].sum() / n),
+        "avg_group": float((cube["Number_of_Person"].astype("float64") * cube["n"]).sum() / n),
+        "retention": float(cube["sum_retention"].sum() / n),
+    }
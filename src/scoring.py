@@ -0,0 +1,161 @@
+"""Scoring por lotes (en español)
+
+Recorre un archivo procesado (CSV o Parquet) por bloques, aplica la
+transformación de features persistida (`FeatureTransformer`) y un modelo
+guardado, reparte los bloques en un pool de procesos y escribe
+`Ticket_ID`, `probability` y `segment` en Parquet, un row group por bloque.
+La memoria pico es de unos pocos bloques, no del archivo completo.
+
+Uso: python -m src.scoring data/processed/cleaned_data.parquet --model retention_model.pkl
+Autor: CMSR92
+"""
+from __future__ import annotations
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from . import registry
+from .feature_engineering import TRANSFORMER_FILE
+
+PROCESSED_DIR = os.path.join("data", "processed")
+SCORES_FILE = "scores.parquet"
+ID_COLUMN = "Ticket_ID"
+# Sin segmentador persistido, el segmento es el tramo de probabilidad (0 = baja ... 3 = alta)
+SEGMENT_THRESHOLDS = (0.25, 0.5, 0.75)
+OUTPUT_SCHEMA = pa.schema([
+    (ID_COLUMN, pa.string()),
+    ("probability", pa.float64()),
+    ("segment", pa.int8()),
+])
+
+# Artefactos cargados una vez por proceso del pool (ver `_init_worker`)
+_artifacts: dict = {}
+
+
+def iter_chunks(path: str, chunksize: int = 200_000) -> Iterator[pd.DataFrame]:
+    """Bloques de `chunksize` filas de un CSV o de una tabla Parquet (archivo o particionada)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró el archivo en {path}")
+    if path.endswith(".parquet"):
+        dataset = ds.dataset(path, format="parquet", partitioning="hive")
+        for batch in dataset.to_batches(batch_size=chunksize):
+            if batch.num_rows:
+                yield batch.to_pandas()
+    else:
+        # El ID se lee como texto: inferido por bloque, "00123" sería 123 o 123.0
+        yield from pd.read_csv(path, chunksize=chunksize, dtype={ID_COLUMN: str})
+
+
+def _init_worker(model_file: str, transformer_file: Optional[str], segmenter_file: Optional[str]) -> None:
+    _artifacts["model"] = registry.load_model(model_file)
+    _artifacts["transformer"] = registry.load_model(transformer_file) if transformer_file else None
+    _artifacts["segmenter"] = registry.load_model(segmenter_file) if segmenter_file else None
+
+
+def score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Puntúa un bloque con los artefactos del proceso: (Ticket_ID, probability, segment).
+
+    Con transformador, el modelo recibe sus features (columnas
+    `feature_names_`); sin él, el bloque tal cual (pipelines con su propio
+    preprocesado, p. ej. `SparseEncoder`). El segmento lo da el segmentador
+    (p. ej. KMeans sobre `transform_matrix`) o, si no hay, el tramo de
+    probabilidad según `SEGMENT_THRESHOLDS`.
+    """
+    transformer = _artifacts["transformer"]
+    segmenter = _artifacts["segmenter"]
+    X = transformer.transform(chunk) if transformer is not None else chunk
+    probability = _artifacts["model"].predict_proba(X)[:, 1]
+    if segmenter is not None:
+        segment = segmenter.predict(X.to_numpy() if isinstance(X, pd.DataFrame) else X)
+    else:
+        segment = np.digitize(probability, SEGMENT_THRESHOLDS)
+    return pd.DataFrame({
+        ID_COLUMN: chunk[ID_COLUMN].astype(str).to_numpy(),
+        "probability": probability.astype("float64"),
+        "segment": np.asarray(segment).astype("int8"),
+    })
+
+
+def _write(writer: pq.ParquetWriter, scores: pd.DataFrame) -> int:
+    writer.write_table(pa.Table.from_pandas(scores, schema=OUTPUT_SCHEMA, preserve_index=False))
+    return len(scores)
+
+
+def score_file(
+    input_path: str,
+    model_file: str = "retention_model.pkl",
+    transformer_file: Optional[str] = TRANSFORMER_FILE,
+    segmenter_file: Optional[str] = None,
+    output_path: str = os.path.join(PROCESSED_DIR, SCORES_FILE),
+    chunksize: int = 200_000,
+    n_jobs: Optional[int] = None,
+) -> Tuple[int, str]:
+    """Puntúa `input_path` por bloques en paralelo y devuelve (filas, ruta_salida).
+
+    Args:
+        input_path: Datos limpios (CSV o Parquet, p. ej. cleaned_data.parquet).
+        model_file: Modelo con `predict_proba`: nombre del registro (`src.registry`,
+            última versión) o archivo en models/ (ver `modeling.save_model`).
+        transformer_file: `FeatureTransformer` ajustado, igual que `model_file`
+            (None = sin transformación).
+        segmenter_file: Modelo de segmentos con `predict` (opcional).
+        output_path: Parquet de salida; se publica de forma atómica al terminar.
+        chunksize: Filas por bloque.
+        n_jobs: Procesos del pool (None = núcleos disponibles, 1 = en serie).
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    artifacts = (model_file, transformer_file, segmenter_file)
+    written = 0
+    with pq.ParquetWriter(tmp_path, OUTPUT_SCHEMA) as writer:
+        if n_jobs == 1:
+            _init_worker(*artifacts)
+            for chunk in iter_chunks(input_path, chunksize):
+                written += _write(writer, score_chunk(chunk))
+        else:
+            workers = n_jobs or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=artifacts) as ex:
+                # Como mucho dos bloques en vuelo por proceso: memoria acotada y orden de entrada
+                in_flight = deque()
+                max_in_flight = 2 * workers
+                for chunk in iter_chunks(input_path, chunksize):
+                    in_flight.append(ex.submit(score_chunk, chunk))
+                    if len(in_flight) >= max_in_flight:
+                        written += _write(writer, in_flight.popleft().result())
+                while in_flight:
+                    written += _write(writer, in_flight.popleft().result())
+    os.replace(tmp_path, output_path)
+    return written, output_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scoring por lotes de un archivo procesado")
+    parser.add_argument("input_path")
+    parser.add_argument("--model", default="retention_model.pkl")
+    parser.add_argument("--transformer", default=TRANSFORMER_FILE, help='"" para no transformar')
+    parser.add_argument("--segmenter", default=None)
+    parser.add_argument("--output", default=os.path.join(PROCESSED_DIR, SCORES_FILE))
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    args = parser.parse_args()
+    rows, path = score_file(
+        args.input_path,
+        model_file=args.model,
+        transformer_file=args.transformer or None,
+        segmenter_file=args.segmenter,
+        output_path=args.output,
+        chunksize=args.chunksize,
+        n_jobs=args.n_jobs,
+    )
+    print(f"{rows:,} filas puntuadas → {path}")
+
+
+if __name__ == "__main__":
+    main()
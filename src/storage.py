@@ -0,0 +1,165 @@
+"""Almacenamiento columnar (en español)
+
+Guarda y lee los artefactos procesados (cleaned_data, model_features,
+customer_segments) en Parquet, conservando dtypes, con proyección de columnas
+y partición opcional por `Movie_Genre`.
+Autor: CMSR92
+"""
+from __future__ import annotations
+import os
+import shutil
+import uuid
+from typing import List, Optional, Sequence
+import pandas as pd
+
+from .dtypes import CATEGORICAL_COLUMNS, DUMMY_PREFIXES, INT8_COLUMNS
+
+PROCESSED_DIR = os.path.join("data", "processed")
+
+
+def table_path(name: str, base_dir: str = PROCESSED_DIR) -> str:
+    """Ruta del archivo (o directorio particionado) Parquet de una tabla."""
+    return os.path.join(base_dir, f"{name}.parquet")
+
+
+def to_storage_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Ajusta dtypes para almacenamiento columnar.
+
+    - Target y segmento a int8
+    - `Number_of_Person` a int16 si no tiene nulos ni decimales (dtype fijo
+      para que los fragmentos añadidos con `append_table` compartan esquema)
+    - Género, tipo de asiento y grupo de edad a category
+    - Dummies one-hot leídas como "True"/"False" desde CSV a bool (las
+      numéricas, p. ej. uint8 en modo compacto, se conservan)
+    """
+    df = df.copy()
+    for c in INT8_COLUMNS:
+        if c in df.columns and df[c].notna().all():
+            df[c] = df[c].astype("int8")
+
+    if "Number_of_Person" in df.columns:
+        s = df["Number_of_Person"]
+        if s.notna().all() and (s % 1 == 0).all():
+            df["Number_of_Person"] = s.astype("int16")
+
+    for c in CATEGORICAL_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+
+    for c in df.columns:
+        if c.startswith(DUMMY_PREFIXES) and df[c].dtype == object:
+            df[c] = df[c].astype(str).str.lower().isin(["true", "1"])
+    return df
+
+
+def save_table(
+    df: pd.DataFrame,
+    name: str,
+    partition_cols: Optional[List[str]] = None,
+    base_dir: str = PROCESSED_DIR,
+) -> str:
+    """Guarda una tabla en Parquet y devuelve la ruta.
+
+    Args:
+        df: DataFrame a guardar.
+        name: Nombre lógico de la tabla (p. ej. "cleaned_data").
+        partition_cols: Columnas de partición (p. ej. ["Movie_Genre"]); se
+            escribe un directorio con una subcarpeta por valor.
+        base_dir: Carpeta destino.
+    Returns:
+        Ruta del archivo o directorio escrito.
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    path = table_path(name, base_dir)
+    tmp_path = path + ".tmp"
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+
+    data = to_storage_dtypes(df)
+    if partition_cols:
+        missing = [c for c in partition_cols if c not in data.columns]
+        if missing:
+            raise ValueError(f"Columnas de partición inexistentes: {missing}")
+        data.to_parquet(tmp_path, index=False, partition_cols=partition_cols)
+    else:
+        data.to_parquet(tmp_path, index=False)
+
+    # Reemplazo atómico del artefacto anterior (archivo o directorio)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path) and os.path.isdir(tmp_path):
+        os.remove(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def append_table(
+    df: pd.DataFrame,
+    name: str,
+    partition_cols: Optional[List[str]] = None,
+    base_dir: str = PROCESSED_DIR,
+) -> str:
+    """Añade filas a una tabla Parquet como un fragmento nuevo (sin reescribir).
+
+    Si la tabla es un único archivo se convierte en directorio y el archivo
+    previo pasa a ser su primer fragmento. Si no existe, se crea.
+    """
+    path = table_path(name, base_dir)
+    if not os.path.exists(path):
+        return save_table(df, name, partition_cols=partition_cols, base_dir=base_dir)
+    if os.path.isfile(path):
+        tmp_dir = path + ".tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        os.replace(path, os.path.join(tmp_dir, "part-0.parquet"))
+        os.replace(tmp_dir, path)
+
+    data = to_storage_dtypes(df)
+    if partition_cols is None:
+        # Reutiliza la partición existente (subcarpetas col=valor)
+        subdirs = [d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d)) and "=" in d]
+        partition_cols = sorted({d.split("=", 1)[0] for d in subdirs}) or None
+    basename = f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+    if partition_cols:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        pq.write_to_dataset(table, path, partition_cols=partition_cols, basename_template=basename)
+    else:
+        data.to_parquet(os.path.join(path, basename.format(i=0)), index=False)
+    return path
+
+
+def load_table(
+    name: str,
+    columns: Optional[Sequence[str]] = None,
+    filters=None,
+    base_dir: str = PROCESSED_DIR,
+) -> pd.DataFrame:
+    """Lee una tabla Parquet leyendo solo las columnas pedidas.
+
+    Args:
+        name: Nombre lógico de la tabla.
+        columns: Columnas a proyectar (None = todas).
+        filters: Filtros de pyarrow, p. ej. [("Movie_Genre", "=", "Drama")];
+            en tablas particionadas solo se leen las particiones necesarias.
+        base_dir: Carpeta de la tabla.
+    Raises:
+        FileNotFoundError: si la tabla no existe.
+    """
+    path = table_path(name, base_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró la tabla {name} en {path}")
+    return pd.read_parquet(path, columns=list(columns) if columns is not None else None, filters=filters)
+
+
+def numeric_columns(name: str, base_dir: str = PROCESSED_DIR) -> List[str]:
+    """Columnas numéricas (enteras o flotantes, sin bool) leyendo solo el esquema."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    path = table_path(name, base_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró la tabla {name} en {path}")
+    schema = ds.dataset(path, format="parquet", partitioning="hive").schema
+    return [f.name for f in schema if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]